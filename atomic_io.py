@@ -0,0 +1,128 @@
+"""Atomic, write-if-changed persistence for note files and generated artifacts.
+
+write_json_if_changed / write_bytes_if_changed:
+  * skip the write when the file already holds the same content (compared by hash,
+    ignoring CRLF vs LF so files saved on Windows are not rewritten on Linux);
+  * otherwise write a temp file in the same directory, fsync it and os.replace() it
+    over the target, so readers never see a half-written file;
+  * hold an exclusive lock on <dir>/.atomic_io.lock while comparing and replacing, so
+    overlapping runners on one machine (scheduler, cron job, manual run) do not
+    interleave their writes.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator
+
+LOCK_NAME = ".atomic_io.lock"
+LOCK_TIMEOUT = float(os.environ.get('ATOMIC_IO_LOCK_TIMEOUT', '30'))
+DEFAULT_MODE = 0o644
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+_thread_locks: Dict[str, threading.RLock] = {}
+_thread_locks_guard = threading.Lock()
+_held = threading.local()
+
+
+@contextlib.contextmanager
+def directory_lock(directory: str, timeout: float = LOCK_TIMEOUT) -> Iterator[None]:
+    """Exclusive lock on a directory's lock file, shared by threads and processes.
+
+    Re-entrant within a thread, so a caller may hold it around several writes.
+    """
+    directory = os.path.abspath(directory or '.')
+    with _thread_locks_guard:
+        thread_lock = _thread_locks.setdefault(directory, threading.RLock())
+    with thread_lock:
+        held = getattr(_held, 'dirs', None)
+        if held is None:
+            held = _held.dirs = {}
+        if held.get(directory):
+            held[directory] += 1
+            try:
+                yield
+            finally:
+                held[directory] -= 1
+            return
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(os.path.join(directory, LOCK_NAME), os.O_RDWR | os.O_CREAT, DEFAULT_MODE)
+        try:
+            deadline = time.monotonic() + timeout
+            while not _try_lock(fd):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for the write lock on {directory}")
+                time.sleep(0.05)
+            held[directory] = 1
+            try:
+                yield
+            finally:
+                held[directory] = 0
+                _unlock(fd)
+        finally:
+            os.close(fd)
+
+
+def content_digest(payload: bytes) -> bytes:
+    return hashlib.sha1(payload.replace(b'\r\n', b'\n')).digest()
+
+
+def write_bytes_if_changed(path: str, payload: bytes) -> bool:
+    """Atomically replace path with payload unless it already holds it; True if written."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with directory_lock(directory):
+        mode = DEFAULT_MODE
+        try:
+            with open(path, 'rb') as f:
+                if content_digest(f.read()) == content_digest(payload):
+                    return False
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            pass
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+    return True
+
+
+def write_json_if_changed(path: str, data: Any, indent=2, separators=None) -> bool:
+    """Write data as JSON only when the serialized bytes differ from the file on disk."""
+    payload = json.dumps(data, indent=indent, separators=separators, ensure_ascii=False).encode('utf-8')
+    return write_bytes_if_changed(path, payload)
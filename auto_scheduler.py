@@ -2,13 +2,19 @@ import schedule
 import time
 import subprocess
 import pytz
-from datetime import datetime, time as dt_time
+from datetime import datetime, time as dt_time, timedelta
 import threading
 import os
 import logging
 import sys
 import requests
 import json
+import argparse
+import hashlib
+import re
+
+from http_session import get_session
+from result_extract import draw_complete, is_placeholder
 
 # Set up logging
 logging.basicConfig(
@@ -23,43 +29,149 @@ logging.basicConfig(
 # Set Indian timezone
 IST = pytz.timezone('Asia/Kolkata')
 
-def run_lottery_scraper():
-    """Run the lottery scraper with better error handling"""
+# Adaptive mode: poll a cheap change signal instead of scraping at fixed times.
+# Polling runs between WINDOW_START and WINDOW_END, every PEAK_POLL_SECONDS while results
+# are usually published (PEAK_START-PEAK_END) and every EDGE_POLL_SECONDS otherwise.
+HOMEPAGE_URL = "https://www.kllotteryresult.com/"
+HOMEPAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+RESULT_SLUG_RE = re.compile(r'kerala-lottery-result-[A-Za-z]{2,3}-\d+')
+WINDOW_START = dt_time(14, 45)
+PEAK_START = dt_time(15, 0)
+PEAK_END = dt_time(16, 30)
+WINDOW_END = dt_time(17, 30)
+PEAK_POLL_SECONDS = int(os.environ.get('PEAK_POLL_SECONDS', '20'))
+EDGE_POLL_SECONDS = int(os.environ.get('EDGE_POLL_SECONDS', '60'))
+# Once the draw shows up, lower tiers keep filling in on the same page without the homepage
+# changing, so scrape again at this interval until it is complete. The same interval is
+# the fallback when the change check itself keeps failing (e.g. the origin blocks us).
+RESCRAPE_SECONDS = int(os.environ.get('RESCRAPE_SECONDS', '180'))
+
+# Watch mode: start live_watcher at WATCH_START (IST) each day instead of the fixed-time scrapes.
+# It re-polls today's draw page alone until every tier is out (or its deadline) and the
+# artifacts are rebuilt and pushed after each change.
+WATCH_START = os.environ.get('WATCH_START', '14:55')
+
+# Worker mode (the default): the scraper and artifact build run inside this process, so
+# imports, HTTP sessions and the draw/HTTP caches stay warm between runs. --isolate
+# (or SCHEDULER_ISOLATE=1) runs them as subprocesses instead. Both modes build the
+# artifacts with build_artifacts.py, so the published files do not depend on the mode.
+SCRAPE_TIMEOUT = 600  # 10 minute timeout for multiple results
+HISTORY_TIMEOUT = 120  # 2 minute timeout
+WORKER = None
+
+class InProcessWorker:
+    """Calls updateloto.main and build_artifacts.build_all in-process, each with a timeout."""
+
+    def __init__(self):
+        start = time.perf_counter()
+        import updateloto
+        import build_artifacts
+        self.updateloto = updateloto
+        self.build_artifacts = build_artifacts
+        self._stuck = None
+        logging.info(f"In-process worker ready ({1000 * (time.perf_counter() - start):.0f}ms to import the scraper)")
+
+    def call(self, func, timeout, description):
+        """Run func in a worker thread; False if it raised, returned False or did not finish within timeout."""
+        if self._stuck is not None and self._stuck.is_alive():
+            # A thread cannot be killed; never run two scrapes over the same files at once
+            logging.error(f"Skipping {description}: the previous {self._stuck.name} is still running")
+            return False
+        outcome = {}
+
+        def target():
+            try:
+                outcome['ok'] = func() is not False
+            except BaseException as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=target, name=description, daemon=True)
+        started = time.perf_counter()
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            self._stuck = thread
+            logging.error(f"{description} timed out after {timeout}s")
+            return False
+        if 'error' in outcome:
+            logging.error(f"Error running {description}: {outcome['error']}")
+            return False
+        if not outcome['ok']:
+            logging.error(f"{description} reported a failure")
+            return False
+        logging.info(f"{description} completed successfully in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def run(self):
+        if not self.call(self.updateloto.main, SCRAPE_TIMEOUT, "Lottery scraper"):
+            return False
+        return self.build()
+
+    def build(self):
+        return self.call(self.build_artifacts.build_all, HISTORY_TIMEOUT, "Artifact build")
+
+def build_isolated():
+    """Run build_artifacts.py as a subprocess; True when it succeeds"""
+    try:
+        result = subprocess.run([sys.executable, 'build_artifacts.py'], capture_output=True, text=True, timeout=HISTORY_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logging.error(f"Artifact build timed out after {HISTORY_TIMEOUT}s")
+        return False
+    if result.returncode != 0:
+        logging.warning(f"Artifact build had issues: {result.stderr}")
+        return False
+    logging.info("Artifact build completed successfully")
+    if result.stdout:
+        logging.info(f"Build output: {result.stdout}")
+    return True
+
+def rebuild_artifacts():
+    """Rebuild manifest, history, latest.json and PDF links in the configured mode"""
+    return WORKER.build() if WORKER is not None else build_isolated()
+
+def run_isolated():
+    """Run the scraper and artifact build as subprocesses; True when both succeed"""
     try:
-        logging.info(f"Running lottery scraper at {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')} IST")
         # Run the scraper script
-        result = subprocess.run([sys.executable, 'updateloto.py'], capture_output=True, text=True, timeout=600)  # 10 minute timeout for multiple results
+        result = subprocess.run([sys.executable, 'updateloto.py'], capture_output=True, text=True, timeout=SCRAPE_TIMEOUT)
         if result.returncode == 0:
             logging.info("Lottery scraper completed successfully")
             if result.stdout:
                 logging.info(f"Output: {result.stdout}")
-            # Run the history generation script after successful scraping
-            hist_result = subprocess.run(['node', 'generate-history.js'], capture_output=True, text=True, timeout=120)  # 2 minute timeout
-            if hist_result.returncode == 0:
-                logging.info("History generation completed successfully")
-                if hist_result.stdout:
-                    logging.info(f"History output: {hist_result.stdout}")
-                
-                # We always want to push updates when the scraper runs successfully
-                # The updateloto.py script now handles whether there are actual changes
-                # If GitHub token is set, commit and push changes
-                github_token = os.environ.get('GITHUB_TOKEN')
-                if github_token:
-                    try:
-                        commit_and_push_changes()
-                    except Exception as e:
-                        logging.error(f"Error during git operations: {e}")
-                else:
-                    logging.info("GITHUB_TOKEN not set. Skipping automatic git push.")
-            else:
-                logging.warning(f"History generation had issues: {hist_result.stderr}")
+            # Build the artifacts after successful scraping
+            return build_isolated()
         else:
-            logging.error(f"Error running lottery scraper: {result.stderr}")
+            # updateloto prints its errors to stdout and exits with 1
+            logging.error(f"Error running lottery scraper: {result.stderr or result.stdout}")
     except subprocess.TimeoutExpired:
         logging.error("Lottery scraper timed out after 10 minutes")
+    return False
+
+def run_lottery_scraper():
+    """Run the lottery scraper with better error handling"""
+    try:
+        logging.info(f"Running lottery scraper at {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')} IST")
+        succeeded = WORKER.run() if WORKER is not None else run_isolated()
+        if succeeded:
+            # We always want to push updates when the scraper runs successfully
+            # The updateloto.py script now handles whether there are actual changes
+            push_changes()
     except Exception as e:
         logging.error(f"Exception occurred while running scraper: {e}")
 
+def push_changes():
+    """Commit and push changes if a GitHub token is set"""
+    github_token = os.environ.get('GITHUB_TOKEN')
+    if github_token:
+        try:
+            commit_and_push_changes()
+        except Exception as e:
+            logging.error(f"Error during git operations: {e}")
+    else:
+        logging.info("GITHUB_TOKEN not set. Skipping automatic git push.")
+
 def has_actual_results():
     """Check if the latest results contain actual winning numbers"""
     try:
@@ -71,13 +183,156 @@ def has_actual_results():
         for prize_key, prize_data in prizes.items():
             winners = prize_data.get('winners', [])
             for winner in winners:
-                if winner != "Please wait, results will be published at 3 PM." and winner != "***":
+                if not is_placeholder(winner):
                     return True
         return False
     except Exception as e:
         logging.error(f"Error checking for actual results: {e}")
         return False
 
+def has_todays_draw():
+    """True when note/latest.json is today's draw with every tier filled in."""
+    try:
+        with open('note/latest.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return False
+    if not isinstance(data, dict) or data.get('draw_date') != datetime.now(IST).strftime('%Y-%m-%d'):
+        return False
+    return draw_complete(data)
+
+class HomepageSignal:
+    """Cheap "something was published" check against the results homepage.
+
+    Sends a conditional GET with the last ETag / Last-Modified; when the page is
+    served without validators, compares a hash of the result links it lists
+    instead of the whole body, so rotating ads or timestamps do not count as changes.
+    """
+
+    def __init__(self, url=HOMEPAGE_URL):
+        self.url = url
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+
+    def changed(self):
+        """True on a change, False when unchanged, None when the check could not be made."""
+        headers = dict(HOMEPAGE_HEADERS)
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        try:
+            response = get_session().get(self.url, headers=headers, timeout=15)
+        except requests.RequestException as e:
+            logging.warning(f"Change check failed: {e}")
+            return None
+        if response.status_code == 304:
+            return False
+        if response.status_code != 200:
+            logging.warning(f"Change check got HTTP {response.status_code}")
+            return None
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        slugs = sorted(set(m.lower() for m in RESULT_SLUG_RE.findall(response.text)))
+        digest = hashlib.sha1('\n'.join(slugs).encode('utf-8')).hexdigest()
+        first = self.digest is None
+        changed = digest != self.digest
+        self.digest = digest
+        # The first poll only establishes a baseline; the startup run already scraped once
+        return changed and not first
+
+def seconds_until(target, now):
+    """Seconds from now (IST) until the next occurrence of the wall-clock time target."""
+    moment = now.replace(hour=target.hour, minute=target.minute, second=0, microsecond=0)
+    if moment <= now:
+        moment = IST.normalize(moment + timedelta(days=1))
+    return (moment - now).total_seconds()
+
+def next_poll_delay(now, captured):
+    """How long to sleep before the next change check."""
+    current = now.time()
+    if captured or not (WINDOW_START <= current <= WINDOW_END):
+        # Nothing to wait for until tomorrow's (or today's) window opens
+        return seconds_until(WINDOW_START, now)
+    if PEAK_START <= current <= PEAK_END:
+        return PEAK_POLL_SECONDS
+    return EDGE_POLL_SECONDS
+
+def run_adaptive_scheduler():
+    """Poll a change signal near publication time and scrape only when it fires."""
+    logging.info("Adaptive scheduler started")
+    logging.info(f"Polling {WINDOW_START.strftime('%H:%M')}-{WINDOW_END.strftime('%H:%M')} IST, "
+                 f"every {PEAK_POLL_SECONDS}s between {PEAK_START.strftime('%H:%M')} and {PEAK_END.strftime('%H:%M')}, "
+                 f"otherwise every {EDGE_POLL_SECONDS}s; idle once today's draw is complete")
+    signal = HomepageSignal()
+    scheduled_task()
+    last_scrape = time.monotonic()
+    signal.changed()
+    in_progress = False
+    while True:
+        captured = has_todays_draw()
+        now = datetime.now(IST)
+        if not captured and WINDOW_START <= now.time() <= WINDOW_END:
+            changed = signal.changed()
+            due = time.monotonic() - last_scrape >= RESCRAPE_SECONDS
+            reason = None
+            if changed:
+                reason = "Homepage changed"
+            elif in_progress and due:
+                reason = "Today's draw is still incomplete"
+            elif changed is None and due:
+                reason = "Change check unavailable"
+            if reason:
+                logging.info(f"{reason} - running scraper")
+                run_lottery_scraper()
+                last_scrape = time.monotonic()
+                in_progress = in_progress or bool(changed)
+                captured = has_todays_draw()
+        if captured and in_progress:
+            logging.info("Today's draw is complete - backing off until tomorrow")
+        if captured or not (WINDOW_START <= now.time() <= WINDOW_END):
+            in_progress = False
+        delay = next_poll_delay(datetime.now(IST), captured)
+        if delay > EDGE_POLL_SECONDS:
+            logging.info(f"Next change check in {delay / 3600:.1f}h")
+        time.sleep(delay)
+
+def publish_watched_draw(filename):
+    """live_watcher callback: rebuild the artifacts after the watched draw changed, then push."""
+    logging.info(f"{filename} changed - publishing")
+    if rebuild_artifacts():
+        push_changes()
+
+def watch_task():
+    """Follow today's draw page until it is complete or the watcher's deadline passes."""
+    import live_watcher
+    logging.info("Starting live watcher for today's draw")
+    try:
+        if live_watcher.watch(on_change=publish_watched_draw):
+            logging.info("Today's draw is complete")
+        else:
+            logging.warning("Live watcher stopped before today's draw was complete")
+    except Exception as e:
+        logging.error(f"Live watcher failed: {e}")
+
+def run_watch_scheduler():
+    """Catch up once, then run the live watcher every day at WATCH_START."""
+    import live_watcher
+    schedule.clear()
+    # WATCH_START is IST like the watcher's deadline, whatever the host's timezone
+    schedule.every().day.at(WATCH_START, IST).do(watch_task)
+    logging.info(f"Watch scheduler started - live watcher runs daily from {WATCH_START} "
+                 f"until {live_watcher.WATCH_DEADLINE} IST")
+    scheduled_task()
+    # Started during the watch window: do not wait for tomorrow
+    now = datetime.now(IST).time()
+    if live_watcher.parse_clock(WATCH_START) <= now < live_watcher.parse_clock(live_watcher.WATCH_DEADLINE):
+        watch_task()
+    while True:
+        schedule.run_pending()
+        time.sleep(30)
+
 def commit_and_push_changes():
     """Commit and push changes to GitHub"""
     try:
@@ -135,6 +390,14 @@ def run_scheduler():
         time.sleep(60)  # Check every minute
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kerala lottery result scheduler")
+    parser.add_argument('--adaptive', action='store_true',
+                        help='poll for changes near publication time instead of scraping at fixed times')
+    parser.add_argument('--watch', action='store_true',
+                        help='run the live watcher on today\'s draw page each afternoon instead of fixed-time scrapes')
+    parser.add_argument('--isolate', action='store_true',
+                        help='run the scraper and history generation as subprocesses instead of in-process')
+    args = parser.parse_args()
     try:
         logging.info("Starting Kerala lottery result scheduler...")
         logging.info(f"Current time: {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')} IST")
@@ -146,8 +409,18 @@ if __name__ == "__main__":
         else:
             logging.warning("GITHUB_TOKEN not set. Auto-push to GitHub will not work.")
         
+        if args.isolate or os.environ.get('SCHEDULER_ISOLATE') == '1':
+            logging.info("Running the scraper in subprocesses (isolated mode)")
+        else:
+            WORKER = InProcessWorker()
+
         # Start the scheduler
-        run_scheduler()
+        if args.watch or os.environ.get('SCHEDULER_MODE') == 'watch':
+            run_watch_scheduler()
+        elif args.adaptive or os.environ.get('SCHEDULER_MODE') == 'adaptive':
+            run_adaptive_scheduler()
+        else:
+            run_scheduler()
     except KeyboardInterrupt:
         logging.info("Scheduler stopped by user")
     except Exception as e:
@@ -0,0 +1,121 @@
+"""Benchmark the HTML parser backends on a stored corpus of real result pages.
+
+Usage:
+    python bench_parsers.py --fetch-recent 20     # save the 20 latest held draws into the corpus
+    python bench_parsers.py --fetch URL [URL...]  # save specific result pages
+    python bench_parsers.py [--repeat 5]          # time every backend on the corpus
+
+Each backend must produce the same result dict as html.parser for every page;
+mismatches are reported and make the script exit with status 1. make_soup keeps
+html.parser as its default until a clean run on a committed corpus backs switching.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import time
+from typing import Dict, List
+
+import updateloto
+from draw_index import KnownDraws
+from html_parsing import available_backends, make_soup
+from result_extract import extract_result
+
+DEFAULT_CORPUS = os.path.join('bench', 'pages')
+RESULT_URL = "https://www.kllotteryresult.com/kerala-lottery-result-{code}-{number}"
+
+
+def corpus_files(corpus_dir: str) -> List[str]:
+    if not os.path.isdir(corpus_dir):
+        return []
+    return sorted(os.path.join(corpus_dir, f) for f in os.listdir(corpus_dir) if f.endswith('.html'))
+
+
+def save_page(corpus_dir: str, url: str) -> None:
+    text = updateloto.fetch_page_text(url)
+    os.makedirs(corpus_dir, exist_ok=True)
+    slug = url.rstrip('/').rsplit('/', 1)[-1] or hashlib.sha1(url.encode('utf-8')).hexdigest()
+    path = os.path.join(corpus_dir, f"{slug}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        # First line records the source URL; extraction falls back to it for the code
+        f.write(f"<!-- {url} -->\n{text}")
+    print(f"Saved {url} -> {path}")
+
+
+def recent_urls(count: int) -> List[str]:
+    draws = KnownDraws('note').items()
+    # Filenames end in the draw date, so sort on it to get the latest draws
+    draws.sort(key=lambda d: d[2][-15:], reverse=True)
+    return [RESULT_URL.format(code=code, number=number) for code, number, _ in draws[:count]]
+
+
+def load_page(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    url = ""
+    if text.startswith("<!-- "):
+        url = text[5:text.index(" -->")]
+    return url, text
+
+
+def run_benchmark(corpus_dir: str, repeat: int) -> int:
+    files = corpus_files(corpus_dir)
+    if not files:
+        print(f"No pages in {corpus_dir}; populate it with --fetch or --fetch-recent first.")
+        return 1
+    pages = [load_page(p) for p in files]
+    backends = available_backends()
+    reference: Dict[str, tuple] = {}
+    timings: Dict[str, float] = {}
+    mismatches = 0
+    for backend in ["html.parser"] + [b for b in backends if b != "html.parser"]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for path, (url, text) in zip(files, pages):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    data, filename = extract_result(make_soup(text, backend), url, text)
+                if backend == "html.parser":
+                    reference[path] = (data, filename)
+                elif reference[path] != (data, filename):
+                    mismatches += 1
+                    print(f"MISMATCH [{backend}] {os.path.basename(path)}")
+        timings[backend] = time.perf_counter() - start
+
+    base = timings["html.parser"]
+    runs = len(files) * repeat
+    print(f"{len(files)} pages x {repeat} runs")
+    print(f"{'backend':<12} {'total s':>9} {'ms/page':>9} {'speedup':>8}")
+    for backend, elapsed in timings.items():
+        print(f"{backend:<12} {elapsed:>9.3f} {1000 * elapsed / runs:>9.2f} {base / elapsed:>7.2f}x")
+    if mismatches:
+        print(f"{mismatches // repeat} page(s) produced different results across backends")
+        return 1
+    print("All backends produced identical results.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='directory of stored result pages')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the corpus per backend')
+    parser.add_argument('--fetch', nargs='+', metavar='URL', help='fetch result pages into the corpus')
+    parser.add_argument('--fetch-recent', type=int, metavar='N', help='fetch the N latest draws held in note/')
+    args = parser.parse_args()
+
+    urls = list(args.fetch or [])
+    if args.fetch_recent:
+        urls.extend(recent_urls(args.fetch_recent))
+    if urls:
+        for url in urls:
+            try:
+                save_page(args.corpus, url)
+            except Exception as e:
+                print(f"Could not fetch {url}: {e}")
+        return 0
+    return run_benchmark(args.corpus, max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
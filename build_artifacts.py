@@ -0,0 +1,100 @@
+"""Build every published artifact from note/ in one pass.
+
+Replaces running generate-manifest.js, generate-history.js and generate-pdf-links.js
+one after another. The note-derived outputs all come from the incremental build in
+process_manual_uploads, so only new or changed note files are re-read:
+
+    result_manifest.json   one entry per draw, newest first
+    history.json           the same draws with their prizes
+    history/, ticket_index/, stats.json
+                           shards, ticket lookup index and number statistics
+    note/latest.json       copy of the newest draw
+    pdf_data.json          official PDF links extended up to today
+
+Each output is written only when its content changes; the time spent on each step is
+reported. Usage: python build_artifacts.py
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytz
+
+from atomic_io import write_json_if_changed
+from draw_calendar import SCHEDULE
+from process_manual_uploads import process_manual_uploads, update_latest_result
+
+IST = pytz.timezone('Asia/Kolkata')
+NOTE_DIR = "note"
+LATEST_PATH = os.path.join(NOTE_DIR, "latest.json")
+PDF_DATA_PATH = "pdf_data.json"
+PDF_URL = "https://result.keralalotteries.com/viewlotisresult.php?drawserial={serial}"
+
+
+def extend_pdf_data(data: List[Dict[str, Any]], today) -> List[Dict[str, Any]]:
+    """Port of generate-pdf-links.js: add one entry per day since the newest entry."""
+    if not data:
+        return data
+    latest = data[0]
+    last_date = datetime.strptime(latest["date"], "%d/%m/%Y").date()
+    serial = int(latest["drawserial"])
+    latest_numbers: Dict[str, int] = {}
+    for item in data:
+        code, _, number = item.get("draw_no", "").partition("-")
+        if number.isdigit():
+            latest_numbers[code] = max(latest_numbers.get(code, 0), int(number))
+
+    new_entries = []
+    day = last_date + timedelta(days=1)
+    serial += 1
+    while day <= today:
+        info = SCHEDULE[day.weekday()]
+        number = latest_numbers.get(info["code"], 0) + 1
+        latest_numbers[info["code"]] = number
+        new_entries.insert(0, {
+            "lottery": info["name"],
+            "draw_no": f"{info['code']}-{number}",
+            "date": day.strftime("%d/%m/%Y"),
+            "drawserial": str(serial),
+            "url": PDF_URL.format(serial=serial),
+        })
+        print(f"Generated: {new_entries[0]['date']} - {info['name']} ({new_entries[0]['draw_no']})")
+        day += timedelta(days=1)
+        serial += 1
+    return new_entries + data
+
+
+def build_all() -> Dict[str, float]:
+    """Build and write all artifacts; returns seconds spent per step."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    def step(name, func):
+        t = time.perf_counter()
+        func()
+        timings[name] = time.perf_counter() - t
+
+    step("manifest/history", process_manual_uploads)
+    step(LATEST_PATH, update_latest_result)
+
+    def pdf_data():
+        if not os.path.exists(PDF_DATA_PATH):
+            print("No existing pdf data found.")
+            return
+        with open(PDF_DATA_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        written = write_json_if_changed(PDF_DATA_PATH, extend_pdf_data(data, datetime.now(IST).date()))
+        print(f"{PDF_DATA_PATH}: {'written' if written else 'unchanged'}")
+    step(PDF_DATA_PATH, pdf_data)
+
+    total = time.perf_counter() - start
+    print(f"Built all artifacts in {1000 * total:.0f}ms")
+    for name, seconds in timings.items():
+        print(f"  {name:<22} {1000 * seconds:8.1f}ms")
+    return timings
+
+
+if __name__ == "__main__":
+    build_all()
@@ -1,9 +1,120 @@
-
-from flask import Flask, send_from_directory, jsonify, render_template_string
+from flask import Flask, Response, send_from_directory, jsonify, render_template_string, request, stream_with_context
+from datetime import date
+from email.utils import formatdate
+from werkzeug.exceptions import NotFound
+import argparse
+import atexit
+import hashlib
+import io
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import re
+import threading
+import time
+import zipfile
+
+from draw_index import KnownDraws
+from process_manual_uploads import parse_filename
+from results_index import ResultsIndex
+from ticket_index import TicketIndex, parse_ticket
 
 app = Flask(__name__)
 
+NOTE_DIR = 'note'
+# How often (seconds) request handlers may re-stat note/ to look for new or edited results
+INDEX_RELOAD_SECONDS = float(os.environ.get('INDEX_RELOAD_SECONDS', '5'))
+MAX_BULK_TICKETS = int(os.environ.get('MAX_BULK_TICKETS', '10000'))
+# Published draw files with complete results never change, so clients may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Behind nginx/Apache, let the front server send files itself (X-Sendfile)
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE', '0') == '1'
+
+# Production server settings (see the __main__ block); ACCESS_LOG='-' logs to stderr, '' disables it
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.environ.get('SERVER_PORT', '5000'))
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', str(min(4, os.cpu_count() or 1))))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '8'))
+ACCESS_LOG = os.environ.get('ACCESS_LOG', 'access.log')
+
+access_log = logging.getLogger('download_server.access')
+access_log.propagate = False
+
+
+def start_access_log(target=ACCESS_LOG):
+    """Route access records through a queue so request threads never wait on the log file."""
+    if not target or access_log.handlers:
+        return None
+    handler = logging.StreamHandler() if target == '-' else logging.FileHandler(target, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    records = queue.SimpleQueue()
+    access_log.addHandler(logging.handlers.QueueHandler(records))
+    access_log.setLevel(logging.INFO)
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+@app.before_request
+def start_timer():
+    request.environ['download_server.start'] = time.perf_counter()
+
+
+@app.after_request
+def log_request(response):
+    if access_log.handlers:
+        elapsed = time.perf_counter() - request.environ.get('download_server.start', time.perf_counter())
+        access_log.info('%s %s %s %d %s %.1fms', request.remote_addr, request.method, request.full_path.rstrip('?'),
+                        response.status_code, response.content_length if response.content_length is not None else '-',
+                        1000 * elapsed)
+    return response
+
+
+def note_dir_signature(note_dir=NOTE_DIR):
+    """Cheap fingerprint of note/: (file count, newest mtime). Changes when files are added, removed or edited."""
+    if not os.path.isdir(note_dir):
+        return (0, 0)
+    count, newest = 0, os.stat(note_dir).st_mtime_ns
+    with os.scandir(note_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.json'):
+                count += 1
+                newest = max(newest, entry.stat().st_mtime_ns)
+    return (count, newest)
+
+
+class LiveTicketIndex:
+    """TicketIndex over note/, loaded once and rebuilt when the directory changes."""
+
+    def __init__(self, note_dir=NOTE_DIR, min_interval=INDEX_RELOAD_SECONDS):
+        self.note_dir = note_dir
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._signature = None
+        self._checked = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked < self.min_interval:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked >= self.min_interval:
+                signature = note_dir_signature(self.note_dir)
+                if signature != self._signature:
+                    start = time.perf_counter()
+                    self._index = TicketIndex.from_note_dir(self.note_dir) if os.path.isdir(self.note_dir) else TicketIndex()
+                    self._signature = signature
+                    print(f"Ticket index loaded: {self._index.draws} draws in {1000 * (time.perf_counter() - start):.0f}ms")
+                self._checked = time.monotonic()
+            return self._index
+
+
+TICKETS = LiveTicketIndex()
+
 # HTML template for the download page
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -52,34 +163,304 @@ HTML_TEMPLATE = """
 </html>
 """
 
+class ListingCache:
+    """Sorted note/ listing with its rendered page and JSON body, rebuilt only when the directory mtime changes."""
+
+    def __init__(self, note_dir=NOTE_DIR):
+        self.note_dir = note_dir
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.files = []
+        self.html = b''
+        self.json = b''
+        self.etag = ''
+        self.last_modified = 0.0
+
+    def get(self):
+        try:
+            mtime = os.stat(self.note_dir).st_mtime_ns
+        except OSError:
+            mtime = 0
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._rebuild(mtime)
+        return self
+
+    def _rebuild(self, mtime):
+        files = []
+        if os.path.exists(self.note_dir):
+            files = [f for f in os.listdir(self.note_dir) if f.endswith('.json')]
+            files.sort(reverse=True)  # Show newest first
+        self.files = files
+        self.json = json.dumps({'files': files}).encode('utf-8')
+        self.html = render_template_string(HTML_TEMPLATE, files=files).encode('utf-8')
+        self.etag = hashlib.sha1(self.json).hexdigest()
+        self.last_modified = mtime / 1e9 if mtime else time.time()
+        KNOWN_DRAWS.refresh()
+        self._mtime = mtime
+
+
+LISTING = ListingCache()
+KNOWN_DRAWS = KnownDraws(NOTE_DIR)
+RESULTS = ResultsIndex()
+MAX_RESULTS_LIMIT = 500
+
+
+def listing_response(body, mimetype, listing):
+    # Listings change whenever a draw is added, so clients revalidate every time and get a 304 if nothing moved
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(f"{listing.etag}-{mimetype.split('/')[-1]}")
+    response.headers['Last-Modified'] = formatdate(listing.last_modified, usegmt=True)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
-    # Get all JSON files from the note directory
-    note_dir = 'note'
-    files = []
-    if os.path.exists(note_dir):
-        files = [f for f in os.listdir(note_dir) if f.endswith('.json')]
-        files.sort(reverse=True)  # Show newest first
-    
-    return render_template_string(HTML_TEMPLATE, files=files)
+    listing = LISTING.get()
+    return listing_response(listing.html, 'text/html', listing)
 
 @app.route('/download/<filename>')
 def download_file(filename):
+    # latest.json and placeholder results are rewritten in place, so only complete draws are immutable
+    immutable = filename != 'latest.json' and KNOWN_DRAWS.is_complete(filename)
     try:
-        return send_from_directory('note', filename, as_attachment=True)
-    except FileNotFoundError:
+        # conditional=True answers If-None-Match / If-Modified-Since with 304; the body goes
+        # out through the server's file wrapper (sendfile) instead of being read into memory
+        response = send_from_directory(NOTE_DIR, filename, as_attachment=True, conditional=True, etag=True,
+                                       max_age=IMMUTABLE_MAX_AGE if immutable else None)
+    except (FileNotFoundError, NotFound):
         return jsonify({'error': 'File not found'}), 404
+    if immutable:
+        response.cache_control.immutable = True
+    return response
 
 @app.route('/api/files')
 def list_files():
     # API endpoint to get list of files
-    note_dir = 'note'
-    files = []
-    if os.path.exists(note_dir):
-        files = [f for f in os.listdir(note_dir) if f.endswith('.json')]
-        files.sort(reverse=True)
-    
-    return jsonify({'files': files})
+    listing = LISTING.get()
+    return listing_response(listing.json, 'application/json', listing)
+
+class ChunkBuffer(io.RawIOBase):
+    """Write-only, unseekable sink for ZipFile; drain() hands over what was written so far."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+CODE_RE = re.compile(r'^[A-Z]{2,3}$')
+
+
+def archive_selection(code, date_from, date_to):
+    """note/ files matching the lottery code and inclusive date range, oldest first."""
+    selected = []
+    for filename in LISTING.get().files:
+        info = parse_filename(filename)
+        if not info:
+            continue
+        if code and info['lottery_code'] != code:
+            continue
+        if (date_from and info['date'] < date_from) or (date_to and info['date'] > date_to):
+            continue
+        selected.append((info['date'], filename))
+    return [filename for _, filename in sorted(selected)]
+
+
+def stream_jsonl(filenames):
+    for filename in filenames:
+        try:
+            with open(os.path.join(NOTE_DIR, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        yield (json.dumps({'filename': filename, **data}, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def stream_zip(filenames):
+    # ZipFile writes data descriptors when its output cannot seek, so each member can be
+    # sent as soon as it is compressed and only one file is ever held in memory
+    sink = ChunkBuffer()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for filename in filenames:
+            path = os.path.join(NOTE_DIR, filename)
+            if not os.path.isfile(path):
+                continue
+            zf.write(path, arcname=filename)
+            yield sink.drain()
+    yield sink.drain()
+
+@app.route('/api/archive')
+def archive():
+    # /api/archive?code=BT&from=2025-06-01&to=2025-09-30&format=zip|jsonl (all parameters optional)
+    code = request.args.get('code', '').strip().upper()
+    date_from = request.args.get('from', '').strip()
+    date_to = request.args.get('to', '').strip()
+    fmt = request.args.get('format', 'zip').strip().lower()
+    if code and not CODE_RE.match(code):
+        return jsonify({'error': 'code must be a lottery code like BT'}), 400
+    for value in (date_from, date_to):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return jsonify({'error': f'invalid date {value!r}, expected YYYY-MM-DD'}), 400
+    if fmt not in ('zip', 'jsonl'):
+        return jsonify({'error': 'format must be zip or jsonl'}), 400
+
+    filenames = archive_selection(code, date_from, date_to)
+    name = '-'.join(part for part in ('results', code, date_from, date_to) if part)
+    if fmt == 'zip':
+        body, mimetype = stream_zip(filenames), 'application/zip'
+    else:
+        body, mimetype = stream_jsonl(filenames), 'application/x-ndjson'
+    # No Content-Length: the body is generated on the fly and sent with chunked transfer
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{name}.{fmt}"'
+    response.headers['X-Archive-Files'] = str(len(filenames))
+    return response
+
+@app.route('/api/results')
+def results():
+    # /api/results?code=BT&from=2025-06-01&to=2025-09-30&draw_from=&draw_to=&order=desc|asc&limit=50&cursor=
+    code = request.args.get('code', '').strip().upper()
+    date_from = request.args.get('from', '').strip()
+    date_to = request.args.get('to', '').strip()
+    if code and not CODE_RE.match(code):
+        return jsonify({'error': 'code must be a lottery code like BT'}), 400
+    for value in (date_from, date_to):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return jsonify({'error': f'invalid date {value!r}, expected YYYY-MM-DD'}), 400
+    try:
+        limit = min(MAX_RESULTS_LIMIT, max(1, int(request.args.get('limit', '50'))))
+        draw_from = int(request.args['draw_from']) if request.args.get('draw_from') else None
+        draw_to = int(request.args['draw_to']) if request.args.get('draw_to') else None
+    except ValueError:
+        return jsonify({'error': 'limit, draw_from and draw_to must be integers'}), 400
+
+    RESULTS.refresh()
+    try:
+        page = RESULTS.query(code or None, date_from or None, date_to or None, draw_from, draw_to, limit,
+                             request.args.get('cursor') or None,
+                             descending=request.args.get('order', 'desc').lower() != 'asc')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(page)
+
+def check_one(index, ticket):
+    ticket = str(ticket).strip()
+    if not parse_ticket(ticket):
+        return {'ticket': ticket, 'error': 'invalid ticket number'}
+    return {'ticket': ticket, 'matches': index.check(ticket)}
+
+@app.route('/api/check')
+def check_ticket():
+    # Single ticket: /api/check?ticket=AB123456 (series optional, 6 digits or a 4-digit ending)
+    ticket = request.args.get('ticket', '')
+    result = check_one(TICKETS.get(), ticket)
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/api/check/bulk', methods=['POST'])
+def check_tickets_bulk():
+    # Body: {"tickets": [...]} as JSON, or plain text with one ticket per line
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        tickets = payload.get('tickets') if isinstance(payload, dict) else payload
+    else:
+        tickets = [line for line in request.get_data(as_text=True).splitlines() if line.strip()]
+    if not isinstance(tickets, list):
+        return jsonify({'error': 'expected a list of tickets'}), 400
+    if len(tickets) > MAX_BULK_TICKETS:
+        return jsonify({'error': f'at most {MAX_BULK_TICKETS} tickets per request'}), 413
+
+    start = time.perf_counter()
+    index = TICKETS.get()
+    results = [check_one(index, t) for t in tickets]
+    return jsonify({
+        'count': len(results),
+        'winners': sum(1 for r in results if r.get('matches')),
+        'draws_indexed': index.draws,
+        'elapsed_ms': round(1000 * (time.perf_counter() - start), 2),
+        'results': results,
+    })
+
+def serve_waitress(host, port, threads):
+    from waitress import serve
+    start_access_log()
+    print(f"Serving on http://{host}:{port} with waitress ({threads} threads)")
+    serve(app, host=host, port=port, threads=threads)
+
+
+def serve_gunicorn(host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            # Workers fork after warm_up(), so each starts with the listing and index loaded
+            self.cfg.set('preload_app', True)
+            # The queue listener is a thread, so each worker starts its own after the fork
+            self.cfg.set('post_fork', lambda server, worker: start_access_log())
+
+        def load(self):
+            return app
+
+    print(f"Serving on http://{host}:{port} with gunicorn ({workers} workers x {threads} threads)")
+    StandaloneApplication().run()
+
+
+def warm_up():
+    with app.app_context():
+        LISTING.get()
+    TICKETS.get()
+    RESULTS.refresh()
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    parser = argparse.ArgumentParser(description='Serve note/ downloads and the result APIs.')
+    parser.add_argument('--server', choices=('auto', 'waitress', 'gunicorn', 'dev'), default='auto',
+                        help='auto = gunicorn where available (not on Windows), else waitress; dev = Flask debug server')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='processes (gunicorn only)')
+    parser.add_argument('--threads', type=int, default=SERVER_THREADS, help='threads per process')
+    args = parser.parse_args()
+
+    if args.server == 'dev':
+        TICKETS.get()
+        RESULTS.refresh()
+        app.run(host=args.host, port=args.port, debug=True)
+    else:
+        server = args.server
+        if server == 'auto':
+            try:
+                import gunicorn  # noqa: F401
+                server = 'gunicorn' if os.name != 'nt' else 'waitress'
+            except ImportError:
+                server = 'waitress'
+        warm_up()
+        if server == 'gunicorn':
+            serve_gunicorn(args.host, args.port, max(1, args.workers), max(1, args.threads))
+        else:
+            serve_waitress(args.host, args.port, max(1, args.threads))
+
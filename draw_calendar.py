@@ -0,0 +1,74 @@
+"""Weekly draw calendar: which lottery draws on which day, and under which number.
+
+Each weekday has one regular lottery, and its draw number goes up by one a week.
+From the newest draw of a code held in note/, expected_draw() predicts the draw
+number for any day, so the scraper can fetch that result page directly, e.g.
+
+    https://www.kllotteryresult.com/kerala-lottery-result-BT-37
+
+before crawling the homepage. Only the seven weekly series are on the calendar, so
+bumper draws (e.g. BR) are still found through homepage discovery, and postponed
+draws break the prediction; callers check the fetched page's date and leave
+anything that does not match to homepage discovery.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from process_manual_uploads import parse_filename
+
+RESULT_URL = "https://www.kllotteryresult.com/kerala-lottery-result-{code}-{number}"
+
+# Lottery drawn on each weekday (Python weekday(): 0=Monday ... 6=Sunday)
+SCHEDULE = {
+    0: {"name": "BHAGYATHARA", "code": "BT"},
+    1: {"name": "STHREE-SAKTHI", "code": "SS"},
+    2: {"name": "DHANALEKSHMI", "code": "DL"},
+    3: {"name": "KARUNYA PLUS", "code": "KN"},
+    4: {"name": "SUVARNA KERALAM", "code": "SK"},
+    5: {"name": "KARUNYA", "code": "KR"},
+    6: {"name": "SAMRUDHI", "code": "SM"},
+}
+
+
+def lottery_for(day: date) -> Dict[str, str]:
+    """{"name", "code"} of the lottery drawn on a day."""
+    return SCHEDULE[day.weekday()]
+
+
+def result_url(code: str, number: int) -> str:
+    return RESULT_URL.format(code=code, number=number)
+
+
+def latest_held(known_draws, code: str) -> Optional[Tuple[int, date]]:
+    """(draw number, draw date) of the newest dated draw held for a code."""
+    best = None
+    for held_code, number, filename in known_draws.items():
+        if held_code != code or (best and number <= best[0]):
+            continue
+        info = parse_filename(filename)
+        try:
+            best = (number, date.fromisoformat(info["date"]))
+        except (TypeError, ValueError):
+            continue
+    return best
+
+
+def expected_draw(day: date, known_draws) -> Optional[Tuple[str, int]]:
+    """(code, draw number) expected on a day, counting one draw a week from the newest held draw."""
+    code = lottery_for(day)["code"]
+    held = latest_held(known_draws, code)
+    if held is None:
+        return None
+    number, held_day = held
+    return code, number + round((day - held_day).days / 7)
+
+
+def expected_draws(today: date, known_draws, days: int = 7) -> List[Tuple[date, str, int]]:
+    """(day, code, draw number) for each of the last `days` days, newest first."""
+    draws = []
+    for back in range(max(1, days)):
+        day = today - timedelta(days=back)
+        predicted = expected_draw(day, known_draws)
+        if predicted:
+            draws.append((day,) + predicted)
+    return draws
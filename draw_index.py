@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from process_manual_uploads import parse_filename
+from result_extract import draw_complete
+
+# Result page slugs look like .../kerala-lottery-result-BT-19
+URL_DRAW_RE = re.compile(r'kerala-lottery-result-([A-Z]{2,3})-(\d+)', re.I)
+
+
+def draw_from_url(url: str) -> Optional[Tuple[str, int]]:
+    """Return (lottery code, draw number) encoded in a result URL slug, if any."""
+    m = URL_DRAW_RE.search(url)
+    if not m:
+        return None
+    return m.group(1).upper(), int(m.group(2))
+
+
+class KnownDraws:
+    """In-memory index of the draws already saved in note/, keyed by (code, draw number).
+
+    Built from note/ filenames with process_manual_uploads.parse_filename and kept
+    current with add() as new files are written. A draw only counts as known once its
+    file holds real winners, so placeholder results are still re-fetched.
+    """
+
+    def __init__(self, note_dir: str = 'note'):
+        self.note_dir = note_dir
+        self._draws: Dict[Tuple[str, int], str] = {}
+        self._complete: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Rebuild the index from the filenames currently in note/."""
+        draws: Dict[Tuple[str, int], str] = {}
+        if os.path.isdir(self.note_dir):
+            for filename in os.listdir(self.note_dir):
+                info = parse_filename(filename)
+                if info:
+                    draws[(info["lottery_code"], int(info["draw_number"]))] = filename
+        with self._lock:
+            self._draws = draws
+            self._complete = {}
+
+    def add(self, filename: str) -> None:
+        """Record a note file that was just written."""
+        info = parse_filename(filename)
+        if not info:
+            return
+        with self._lock:
+            self._draws[(info["lottery_code"], int(info["draw_number"]))] = filename
+            self._complete.pop(filename, None)
+
+    def __contains__(self, draw: Tuple[str, int]) -> bool:
+        with self._lock:
+            return draw in self._draws
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._draws)
+
+    def items(self) -> List[Tuple[str, int, str]]:
+        """All held draws as (code, draw number, filename)."""
+        with self._lock:
+            return [(code, number, filename) for (code, number), filename in self._draws.items()]
+
+    def filename_for(self, code: str, draw_number: int) -> Optional[str]:
+        with self._lock:
+            return self._draws.get((code, draw_number))
+
+    def latest_draw_number(self, code: str) -> int:
+        """Highest draw number held for a lottery code, 0 if none."""
+        with self._lock:
+            return max((n for c, n in self._draws if c == code), default=0)
+
+    def is_complete(self, filename: str) -> bool:
+        """True when every tier of the note file is complete (see result_extract.draw_complete)."""
+        with self._lock:
+            if self._complete.get(filename):
+                return True
+        try:
+            with open(os.path.join(self.note_dir, filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        complete = draw_complete(data)
+        with self._lock:
+            self._complete[filename] = complete
+        return complete
+
+    def is_known_url(self, url: str) -> bool:
+        """True when the URL maps to a draw we already hold with complete results."""
+        draw = draw_from_url(url)
+        if not draw:
+            return False
+        filename = self.filename_for(*draw)
+        return bool(filename) and self.is_complete(filename)
@@ -38,7 +38,9 @@ function parseJsonFile(filePath, fileName) {
         prize_key,
         label: prize_obj.label || '',
         amount: prize_obj.amount || 0,
-        winners: Array.isArray(prize_obj.winners) ? prize_obj.winners : []
+        winners: Array.isArray(prize_obj.winners) ? prize_obj.winners : [],
+        // Per-tier flag of draws published while still being announced
+        ...(typeof prize_obj.complete === 'boolean' ? { complete: prize_obj.complete } : {})
       });
       // Collect numbers for prediction
       if (["4th_prize","5th_prize","6th_prize","7th_prize","8th_prize","9th_prize"].includes(prize_key)) {
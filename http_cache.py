@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+DEFAULT_CACHE_DIR = os.environ.get('HTTP_CACHE_DIR', '.http_cache')
+DEFAULT_MAX_BYTES = int(float(os.environ.get('HTTP_CACHE_MAX_MB', '64')) * 1024 * 1024)
+# Cached bodies older than this are not revalidated; the page is fetched in full again.
+DEFAULT_TTL_SECONDS = int(float(os.environ.get('HTTP_CACHE_TTL_HOURS', '72')) * 3600)
+
+
+class ResponseCache:
+    """On-disk cache of response bodies and their validators (ETag / Last-Modified).
+
+    Each URL is stored as <sha1>.json (metadata) plus <sha1>.body (raw bytes).
+    Requests for a cached URL carry If-None-Match / If-Modified-Since, and a 304
+    answer is served from the stored body. Entries expire after ttl seconds and
+    the least recently used ones are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: int = DEFAULT_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _read_meta(self, meta_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path: str, meta: Dict[str, Any]) -> None:
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def get_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored metadata for url if it exists and has not expired."""
+        meta_path, body_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if not meta or meta.get('url') != url or not os.path.exists(body_path):
+            return None
+        if time.time() - meta.get('stored_at', 0) > self.ttl:
+            self.delete(url)
+            return None
+        return meta
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validator headers to send for url, empty when nothing usable is cached."""
+        meta = self.get_meta(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url: str, res: requests.Response) -> None:
+        """Cache a 200 response that carries validators."""
+        etag = res.headers.get('ETag')
+        last_modified = res.headers.get('Last-Modified')
+        if res.status_code != 200 or not (etag or last_modified):
+            return
+        meta_path, body_path = self._paths(url)
+        now = time.time()
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': res.encoding,
+            'content_type': res.headers.get('Content-Type', ''),
+            'size': len(res.content),
+            'stored_at': now,
+            'used_at': now,
+        }
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(body_path, 'wb') as f:
+                    f.write(res.content)
+                self._write_meta(meta_path, meta)
+            except OSError as e:
+                print(f"Could not cache {url}: {e}")
+                return
+            self._evict()
+
+    def revalidated(self, url: str, res: requests.Response) -> Optional[requests.Response]:
+        """Build a 200 response from the cached body after the server answered 304."""
+        meta = self.get_meta(url)
+        if not meta:
+            return None
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = body
+        cached.encoding = meta.get('encoding')
+        cached.url = url
+        cached.headers.update({'Content-Type': meta.get('content_type', '')})
+        cached.headers.update(res.headers)
+        cached.from_cache = True
+        # The server confirmed the body is current: restart its TTL
+        meta['etag'] = res.headers.get('ETag', meta.get('etag'))
+        meta['last_modified'] = res.headers.get('Last-Modified', meta.get('last_modified'))
+        meta['stored_at'] = meta['used_at'] = time.time()
+        with self._lock:
+            try:
+                self._write_meta(meta_path, meta)
+            except OSError:
+                pass
+        return cached
+
+    def annotate(self, url: str, **fields: Any) -> None:
+        """Attach extra fields (e.g. the note file a page produced) to a cached entry."""
+        meta_path, _ = self._paths(url)
+        with self._lock:
+            meta = self._read_meta(meta_path)
+            if not meta or meta.get('url') != url:
+                return
+            meta.setdefault('extra', {}).update(fields)
+            try:
+                self._write_meta(meta_path, meta)
+            except OSError:
+                pass
+
+    def delete(self, url: str) -> None:
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith('.json')]
+        except OSError:
+            return
+        now = time.time()
+        entries = []
+        total = 0
+        for name in names:
+            meta_path = os.path.join(self.cache_dir, name)
+            body_path = meta_path[:-len('.json')] + '.body'
+            meta = self._read_meta(meta_path)
+            if not meta or now - meta.get('stored_at', 0) > self.ttl:
+                for path in (meta_path, body_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            entries.append((meta.get('used_at', 0), meta.get('size', 0), meta_path, body_path))
+            total += meta.get('size', 0)
+        entries.sort()
+        for _, size, meta_path, body_path in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
@@ -0,0 +1,72 @@
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Keep-alive connection pool size per host. Override with
+# HTTP_POOL_SIZES="www.kllotteryresult.com=8,r.jina.ai=2"; other hosts get HTTP_POOL_DEFAULT.
+DEFAULT_POOL_SIZE = int(os.environ.get('HTTP_POOL_DEFAULT', '4'))
+POOL_SIZES: Dict[str, int] = {
+    'www.kllotteryresult.com': 8,
+    urlparse(os.environ.get('SCRAPERAPI_ENDPOINT', 'http://api.scraperapi.com')).netloc or 'api.scraperapi.com': 4,
+    'r.jina.ai': 4,
+}
+
+
+def _accept_encoding() -> str:
+    try:
+        import brotli  # noqa: F401  (requests/urllib3 decode br only when it is installed)
+        return 'gzip, deflate, br'
+    except ImportError:
+        return 'gzip, deflate'
+
+
+def _pool_sizes() -> Dict[str, int]:
+    sizes = dict(POOL_SIZES)
+    for item in os.environ.get('HTTP_POOL_SIZES', '').split(','):
+        host, _, size = item.partition('=')
+        if host.strip() and size.strip().isdigit():
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+def build_session(pool_sizes: Optional[Dict[str, int]] = None) -> requests.Session:
+    """Create a keep-alive session with per-host connection pools and compressed transfers."""
+    session = requests.Session()
+    session.headers.update({
+        'Accept-Encoding': _accept_encoding(),
+        'Connection': 'keep-alive',
+    })
+    session.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=DEFAULT_POOL_SIZE))
+    session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=DEFAULT_POOL_SIZE))
+    for host, size in (pool_sizes or _pool_sizes()).items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f'http://{host}', adapter)
+        session.mount(f'https://{host}', adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session's pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,154 @@
+"""Follow today's draw page until every prize tier is published.
+
+Results appear tier by tier from about 3 PM. Instead of scraping everything at fixed
+times, the watcher locks onto today's result URL (predicted by draw_calendar) and
+re-polls only that page with conditional requests through updateloto's HTTP cache.
+Each time the page changes it is saved with updateloto.process_result_page and the
+on_change callback runs. The interval drops to WATCH_MIN_SECONDS after a change and
+backs off towards WATCH_MAX_SECONDS while the page stays the same. The watcher stops
+once every tier has real winners, or at the deadline.
+
+    python live_watcher.py                       # today's draw, until 18:00 IST
+    python live_watcher.py --deadline 17:30
+    python live_watcher.py --url https://www.kllotteryresult.com/kerala-lottery-result-BT-37
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, time as dt_time
+from typing import Callable, Optional, Tuple
+
+import draw_calendar
+import updateloto
+from html_parsing import head_text, make_soup
+from result_extract import parse_date_from_text
+
+WATCH_MIN_SECONDS = float(os.environ.get('WATCH_MIN_SECONDS', '15'))
+WATCH_MAX_SECONDS = float(os.environ.get('WATCH_MAX_SECONDS', '90'))
+WATCH_BACKOFF = 1.5
+WATCH_DEADLINE = os.environ.get('WATCH_DEADLINE', '18:00')
+IST = updateloto.IST
+
+# poll() outcomes
+NOT_PUBLISHED = "not published"
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+COMPLETE = "complete"
+FAILED = "failed"
+
+
+def parse_clock(value: str) -> dt_time:
+    hour, _, minute = value.partition(':')
+    return dt_time(int(hour), int(minute or 0))
+
+
+def note_signature(filename: str):
+    try:
+        st = os.stat(os.path.join('note', filename))
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def poll(url: str, today) -> Tuple[str, Optional[str]]:
+    """Fetch the page once and save today's result from it; returns (outcome, note filename or None).
+
+    UPDATED only means the page was parsed and saved; watch() compares note file
+    signatures to tell whether the saved result actually changed.
+    """
+    try:
+        response = updateloto.robust_get(url, updateloto.HEADERS, timeout=20, max_retries=1)
+        if response.status_code == 404:
+            return NOT_PUBLISHED, None
+        response.raise_for_status()
+        if url in updateloto.UNCHANGED_URLS:
+            updateloto.UNCHANGED_URLS.discard(url)
+            return UNCHANGED, None
+        text = response.text
+    except Exception as e:
+        # Origin blocked or down: read through the proxy, without conditional requests
+        try:
+            text = updateloto.fetch_text_via_jina(url)
+        except Exception:
+            print(f"Poll failed: {e}")
+            return FAILED, None
+
+    result_date = parse_date_from_text(head_text(text)) or parse_date_from_text(text)
+    if result_date != today:
+        return NOT_PUBLISHED, None
+    _, filename = updateloto.process_result_page(make_soup(text), url, text)
+    if updateloto.HTTP_CACHE:
+        updateloto.HTTP_CACHE.annotate(url, note_file=filename)
+    return (COMPLETE if updateloto.KNOWN_DRAWS.is_complete(filename) else UPDATED), filename
+
+
+def watch(url: Optional[str] = None, deadline: Optional[str] = None,
+          on_change: Optional[Callable[[str], None]] = None) -> bool:
+    """Poll one result page until all tiers are filled; True when the draw is complete."""
+    now = datetime.now(IST)
+    today = now.date()
+    end = IST.localize(datetime.combine(today, parse_clock(deadline or WATCH_DEADLINE)))
+    updateloto.KNOWN_DRAWS.refresh()
+    if url is None:
+        predicted = draw_calendar.expected_draw(today, updateloto.KNOWN_DRAWS)
+        if not predicted:
+            print("No held draws to predict today's draw from")
+            return False
+        url = draw_calendar.result_url(*predicted)
+    if updateloto.KNOWN_DRAWS.is_known_url(url):
+        print(f"{url} is already complete")
+        return True
+
+    print(f"Watching {url} until {end.strftime('%H:%M')} IST")
+    delay = WATCH_MIN_SECONDS
+    polls = 0
+    saved = None
+    try:
+        while True:
+            polls += 1
+            outcome, filename = poll(url, today)
+            if outcome == UPDATED:
+                signature = note_signature(filename)
+                if signature == saved:
+                    outcome = UNCHANGED
+                saved = signature
+            stamp = datetime.now(IST).strftime('%H:%M:%S')
+            print(f"[{stamp}] poll {polls}: {outcome}" + (f" ({filename})" if filename else ""))
+            if outcome in (UPDATED, COMPLETE) and on_change:
+                on_change(filename)
+            if outcome == COMPLETE:
+                print(f"All tiers published after {polls} polls")
+                return True
+            if outcome == UPDATED:
+                delay = WATCH_MIN_SECONDS
+            elif outcome == FAILED:
+                delay = WATCH_MAX_SECONDS
+            else:
+                delay = min(WATCH_MAX_SECONDS, delay * WATCH_BACKOFF)
+            remaining = (end - datetime.now(IST)).total_seconds()
+            if remaining <= 0:
+                print(f"Deadline reached after {polls} polls; draw still incomplete")
+                return False
+            time.sleep(min(delay, remaining))
+    finally:
+        updateloto.PAGE_STORE.close()
+        updateloto.UNCHANGED_URLS.clear()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watch today's draw page until every tier is published.")
+    parser.add_argument("--url", help="result page to watch (default: today's draw from the calendar)")
+    parser.add_argument("--deadline", default=WATCH_DEADLINE, help="stop at this IST time, HH:MM")
+    parser.add_argument("--no-build", action="store_true", help="do not rebuild the artifacts on changes")
+    args = parser.parse_args()
+
+    on_change = None
+    if not args.no_build:
+        from build_artifacts import build_all
+        on_change = lambda filename: build_all()
+    return 0 if watch(args.url, args.deadline, on_change) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Load-test a running download_server instance.
+
+Usage:
+    python download_server.py &                       # production mode on :5000
+    python loadtest.py --url http://127.0.0.1:5000 --concurrency 32 --duration 20
+
+Each client thread cycles through the listing, download and API routes with its own
+keep-alive session. The report gives requests per second plus p50/p99 latency
+per route and overall. Add --revalidate to send the ETag from the previous
+response, as a returning browser would during the 3 PM spike.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import requests
+
+SAMPLE_TICKETS = ["BZ 783510", "123456", "0505", "AB 000001", "4392", "950117"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def build_routes(base: str) -> List[Tuple[str, str, dict]]:
+    """(name, method, request kwargs) for every route under test."""
+    files = requests.get(f"{base}/api/files", timeout=10).json().get("files", [])
+    draws = [f for f in files if f != "latest.json"][:20]
+    routes = [
+        ("index", "GET", {"url": f"{base}/"}),
+        ("api_files", "GET", {"url": f"{base}/api/files"}),
+        ("latest", "GET", {"url": f"{base}/download/latest.json"}),
+        ("results", "GET", {"url": f"{base}/api/results?limit=50"}),
+        ("check", "GET", {"url": f"{base}/api/check", "params_from": SAMPLE_TICKETS}),
+        ("check_bulk", "POST", {"url": f"{base}/api/check/bulk",
+                                "json": {"tickets": [f"{n:06d}" for n in random.sample(range(10 ** 6), 200)]}}),
+    ]
+    if draws:
+        routes.append(("download", "GET", {"url": f"{base}/download/{{}}", "files": draws}))
+    return routes
+
+
+def client(routes, deadline: float, revalidate: bool, results: Dict[str, List[float]], errors: Dict[str, int], lock):
+    session = requests.Session()
+    etags: Dict[str, str] = {}
+    local: Dict[str, List[float]] = {name: [] for name, _, _ in routes}
+    local_errors: Dict[str, int] = {}
+    while time.perf_counter() < deadline:
+        for name, method, spec in routes:
+            url = spec["url"]
+            kwargs = {"timeout": 30}
+            if "files" in spec:
+                url = url.format(random.choice(spec["files"]))
+            if "params_from" in spec:
+                kwargs["params"] = {"ticket": random.choice(spec["params_from"])}
+            if "json" in spec:
+                kwargs["json"] = spec["json"]
+            if revalidate and url in etags:
+                kwargs["headers"] = {"If-None-Match": etags[url]}
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+                response.content
+                ok = response.status_code in (200, 304)
+            except requests.RequestException:
+                ok = False
+                response = None
+            elapsed = time.perf_counter() - start
+            if ok:
+                local[name].append(elapsed)
+                if response.headers.get("ETag"):
+                    etags[url] = response.headers["ETag"]
+            else:
+                local_errors[name] = local_errors.get(name, 0) + 1
+    with lock:
+        for name, samples in local.items():
+            results.setdefault(name, []).extend(samples)
+        for name, count in local_errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test download_server.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="base URL of the running server")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--duration", type=float, default=15, help="seconds to run")
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match with the last ETag seen")
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    try:
+        routes = build_routes(base)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Could not reach {base}: {e}")
+        return 1
+
+    results: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(routes, deadline, args.revalidate, results, errors, lock))
+               for _ in range(max(1, args.concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    everything = [s for samples in results.values() for s in samples]
+    print(f"{args.concurrency} clients, {wall:.1f}s, {len(everything)} requests, "
+          f"{len(everything) / wall:.0f} req/s, {sum(errors.values())} errors")
+    print(f"{'route':<12} {'count':>7} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, _, _ in routes:
+        samples = results.get(name, [])
+        print(f"{name:<12} {len(samples):>7} {len(samples) / wall:>7.0f} "
+              f"{1000 * percentile(samples, 50):>8.1f} {1000 * percentile(samples, 99):>8.1f} {errors.get(name, 0):>7}")
+    print(f"{'all':<12} {len(everything):>7} {len(everything) / wall:>7.0f} "
+          f"{1000 * percentile(everything, 50):>8.1f} {1000 * percentile(everything, 99):>8.1f} {sum(errors.values()):>7}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
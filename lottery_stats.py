@@ -0,0 +1,229 @@
+"""Precomputed number statistics for prediction.html.
+
+Keeps NumPy count arrays over every winning number in history and writes a small
+stats.json: hot/cold/repeat/overdue lists for 6-digit numbers and 4-digit endings,
+per-position digit frequencies, and per-lottery-code summaries. The counts are
+persisted in stats_state.npz, so a build only adds the draws it has not counted
+yet; a full recount happens only when an already counted draw changes or goes away.
+
+    python lottery_stats.py            # update from history.json
+    python lottery_stats.py --rebuild  # recount everything
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+STATS_PATH = "stats.json"
+STATE_PATH = "stats_state.npz"
+TOP_N = 15
+SAMPLE_SIZE = 60
+
+POW6 = 10 ** np.arange(5, -1, -1)
+POW4 = 10 ** np.arange(3, -1, -1)
+
+
+def entry_digest(entry: Dict[str, Any]) -> str:
+    """Hash of the fields the counts depend on, to spot draws that changed after counting."""
+    key = [entry.get("date"), entry.get("lottery"), entry.get("numbers6") or [], entry.get("numbers4") or []]
+    return hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+
+
+def day_number(value: str) -> int:
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def digit_columns(numbers: np.ndarray, powers: np.ndarray) -> np.ndarray:
+    """(n,) ints -> (n, width) array of their decimal digits, most significant first."""
+    return (numbers[:, None] // powers[None, :]) % 10
+
+
+class NumberStats:
+    """Frequency and last-seen arrays indexed directly by the winning number."""
+
+    def __init__(self):
+        self.freq6 = np.zeros(10 ** 6, dtype=np.int32)
+        self.last6 = np.zeros(10 ** 6, dtype=np.int32)
+        self.freq4 = np.zeros(10 ** 4, dtype=np.int32)
+        self.last4 = np.zeros(10 ** 4, dtype=np.int32)
+        self.pos6 = np.zeros((6, 10), dtype=np.int64)
+        self.pos4 = np.zeros((4, 10), dtype=np.int64)
+        self.codes: List[str] = []
+        self.code_draws = np.zeros(0, dtype=np.int32)
+        self.code_last = np.zeros(0, dtype=np.int32)
+        self.code_freq4 = np.zeros((0, 10 ** 4), dtype=np.int32)
+        self.counted: Dict[str, str] = {}
+
+    def code_index(self, code: str) -> int:
+        if code not in self.codes:
+            self.codes.append(code)
+            self.code_draws = np.append(self.code_draws, 0).astype(np.int32)
+            self.code_last = np.append(self.code_last, 0).astype(np.int32)
+            self.code_freq4 = np.vstack([self.code_freq4, np.zeros((1, 10 ** 4), dtype=np.int32)])
+        return self.codes.index(code)
+
+    def add(self, entries: List[Dict[str, Any]]) -> None:
+        """Count a batch of history entries with one vectorised update per array."""
+        if not entries:
+            return
+        n6, d6, n4, d4, c4 = [], [], [], [], []
+        for entry in entries:
+            day = day_number(entry.get("date"))
+            ci = self.code_index(entry.get("lottery") or "XX")
+            self.code_draws[ci] += 1
+            self.code_last[ci] = max(self.code_last[ci], day)
+            six = [int(n) for n in entry.get("numbers6") or [] if len(n) == 6 and n.isdigit()]
+            four = [int(n) for n in entry.get("numbers4") or [] if len(n) == 4 and n.isdigit()]
+            n6 += six
+            d6 += [day] * len(six)
+            n4 += four
+            d4 += [day] * len(four)
+            c4 += [ci] * len(four)
+            self.counted[entry.get("filename", "")] = entry_digest(entry)
+
+        n6 = np.asarray(n6, dtype=np.int64)
+        n4 = np.asarray(n4, dtype=np.int64)
+        np.add.at(self.freq6, n6, 1)
+        np.maximum.at(self.last6, n6, np.asarray(d6, dtype=np.int32))
+        np.add.at(self.freq4, n4, 1)
+        np.maximum.at(self.last4, n4, np.asarray(d4, dtype=np.int32))
+        np.add.at(self.code_freq4, (np.asarray(c4, dtype=np.int64), n4), 1)
+        for pos, digits in ((self.pos6, digit_columns(n6, POW6)), (self.pos4, digit_columns(n4, POW4))):
+            for p in range(pos.shape[0]):
+                pos[p] += np.bincount(digits[:, p], minlength=10)
+
+    def save(self, path: str = STATE_PATH) -> None:
+        from atomic_io import write_bytes_if_changed
+
+        files = sorted(self.counted)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            freq6=self.freq6, last6=self.last6, freq4=self.freq4, last4=self.last4,
+            pos6=self.pos6, pos4=self.pos4,
+            codes=np.array(self.codes, dtype=str), code_draws=self.code_draws,
+            code_last=self.code_last, code_freq4=self.code_freq4,
+            files=np.array(files, dtype=str),
+            digests=np.array([self.counted[f] for f in files], dtype=str),
+        )
+        write_bytes_if_changed(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path: str = STATE_PATH) -> Optional["NumberStats"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as state:
+                stats = cls()
+                for name in ("freq6", "last6", "freq4", "last4", "pos6", "pos4",
+                             "code_draws", "code_last", "code_freq4"):
+                    setattr(stats, name, state[name].copy())
+                stats.codes = [str(c) for c in state["codes"]]
+                stats.counted = dict(zip((str(f) for f in state["files"]), (str(d) for d in state["digests"])))
+                return stats
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load {path}: {e}")
+            return None
+
+    def to_json(self) -> Dict[str, Any]:
+        """The stats.json payload; day counts are relative to the latest counted draw."""
+        as_of = int(max(self.code_last.max(initial=0), 0))
+        draws = int(self.code_draws.sum())
+        # Seeded by the draw count so rebuilding the same history gives the same sample
+        rng = np.random.default_rng(draws)
+        return {
+            "draws": draws,
+            "as_of": date.fromordinal(as_of).isoformat() if as_of else None,
+            "six": ranked(self.freq6, self.last6, as_of, 6, rng),
+            "four": ranked(self.freq4, self.last4, as_of, 4, rng),
+            "positions": {"six": self.pos6.tolist(), "four": self.pos4.tolist()},
+            "codes": {
+                code: {
+                    "draws": int(self.code_draws[i]),
+                    "last_date": date.fromordinal(int(self.code_last[i])).isoformat() if self.code_last[i] else None,
+                    "hot4": top_items(self.code_freq4[i], None, as_of, 4, np.argsort(-self.code_freq4[i], kind="stable")[:10]),
+                }
+                for i, code in enumerate(self.codes)
+            },
+        }
+
+
+def top_items(freq: np.ndarray, last: Optional[np.ndarray], as_of: int, width: int, order: np.ndarray) -> List[List[Any]]:
+    """[number, count(, days since last seen)] rows for the given indices, skipping unseen numbers."""
+    rows = []
+    for n in order:
+        if freq[n] == 0:
+            continue
+        row = [f"{int(n):0{width}d}", int(freq[n])]
+        if last is not None:
+            row.append(as_of - int(last[n]))
+        rows.append(row)
+    return rows
+
+
+def ranked(freq: np.ndarray, last: np.ndarray, as_of: int, width: int, rng) -> Dict[str, Any]:
+    seen = np.flatnonzero(freq)
+    counts = freq[seen]
+    # Ties break on the smaller number; lexsort sorts by the last key first
+    hot = seen[np.lexsort((seen, -counts))][:TOP_N]
+    cold = seen[np.lexsort((seen, counts))][:TOP_N]
+    repeat = hot[freq[hot] > 1]
+    overdue = seen[np.lexsort((seen, last[seen]))][:TOP_N]
+    # Sample weighted by frequency, i.e. a shuffle of every winning number drawn so far
+    sample = rng.choice(seen, size=min(SAMPLE_SIZE, len(seen)), replace=False,
+                        p=counts / counts.sum()) if len(seen) else seen
+    return {
+        "distinct": int(len(seen)),
+        "total": int(counts.sum()),
+        "hot": top_items(freq, last, as_of, width, hot),
+        "cold": top_items(freq, last, as_of, width, cold),
+        "repeat": top_items(freq, last, as_of, width, repeat),
+        "overdue": top_items(freq, last, as_of, width, overdue),
+        "sample": [f"{int(n):0{width}d}" for n in sample],
+    }
+
+
+def update_stats(history: List[Dict[str, Any]], rebuild: bool = False,
+                 stats_path: str = STATS_PATH, state_path: str = STATE_PATH) -> NumberStats:
+    """Count draws not yet in the saved state and rewrite stats.json if it changed."""
+    from atomic_io import write_json_if_changed
+
+    # Draws still being announced are counted once every tier is out
+    history = [e for e in history if all(p.get("complete", True) for p in e.get("prizes") or [])]
+    current = {e.get("filename", ""): entry_digest(e) for e in history}
+    stats = None if rebuild else NumberStats.load(state_path)
+    if stats is not None and any(current.get(f) != d for f, d in stats.counted.items()):
+        print("Counted draws changed or were removed; recounting")
+        stats = None
+    if stats is None:
+        stats = NumberStats()
+    pending = [e for e in history if e.get("filename", "") not in stats.counted]
+    stats.add(pending)
+    if pending or not os.path.exists(state_path):
+        stats.save(state_path)
+    written = write_json_if_changed(stats_path, stats.to_json(), indent=None, separators=(",", ":"))
+    print(f"Stats: counted {len(pending)} new draw(s), {len(stats.counted)} total; "
+          f"{stats_path} {'written' if written else 'unchanged'}")
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Update stats.json from history.json.")
+    parser.add_argument("--rebuild", action="store_true", help="recount every draw")
+    args = parser.parse_args()
+    from process_manual_uploads import load_existing_history
+    update_stats(load_existing_history(), rebuild=args.rebuild)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Memory budget for page texts held by one run (bytes of UTF-8 text).
+DEFAULT_MAX_BYTES = int(float(os.environ.get('PAGE_STORE_MAX_MB', '32')) * 1024 * 1024)
+
+
+class PageStore:
+    """Per-run store of fetched page texts keyed by URL.
+
+    Discovery fills the store and processing reads from it, so each result page is
+    downloaded once per run. Pages are kept in memory up to max_bytes; the least
+    recently used ones are then spilled to disk when spill is enabled, or dropped.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, spill: bool = False, spill_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spill = spill or bool(spill_dir)
+        self._spill_dir = spill_dir
+        self._own_spill_dir = False
+        self._pages: "OrderedDict[str, str]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Dict[str, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._pages or url in self._spilled
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pages) + len(self._spilled)
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the stored text for url, or None if it was never stored or was dropped."""
+        with self._lock:
+            if url in self._pages:
+                self._pages.move_to_end(url)
+                return self._pages[url]
+            path = self._spilled.get(url)
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, url: str, text: str) -> None:
+        """Store text for url, evicting least recently used pages past the memory bound."""
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self._discard(url)
+            self._pages[url] = text
+            self._sizes[url] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._pages) > 1:
+                old_url, old_text = self._pages.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_url)
+                if self.spill:
+                    self._spill(old_url, old_text)
+
+    def close(self) -> None:
+        """Forget all pages and remove any spill directory this store created."""
+        with self._lock:
+            self._pages.clear()
+            self._sizes.clear()
+            self._spilled.clear()
+            self._bytes = 0
+            if self._own_spill_dir and self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+                self._own_spill_dir = False
+
+    def _discard(self, url: str) -> None:
+        if url in self._pages:
+            del self._pages[url]
+            self._bytes -= self._sizes.pop(url)
+        path = self._spilled.pop(url, None)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _spill(self, url: str, text: str) -> None:
+        if not self._spill_dir:
+            self._spill_dir = tempfile.mkdtemp(prefix='loto-pages-')
+            self._own_spill_dir = True
+        os.makedirs(self._spill_dir, exist_ok=True)
+        path = os.path.join(self._spill_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self._spilled[url] = path
+        except OSError as e:
+            print(f"Could not spill {url} to disk: {e}")
@@ -1,8 +1,35 @@
 import os
 import json
 import re
+import hashlib
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import quote
+
+import ticket_index
+from atomic_io import write_bytes_if_changed, write_json_if_changed
+
+try:
+    from lottery_stats import STATS_PATH, update_stats
+except ImportError:  # numpy not installed; stats.json is left as it is
+    STATS_PATH = None
+    update_stats = None
+
+# Per-file size/content hash from the previous build, so unchanged note files are
+# not re-ingested. Committed alongside the artifacts, so it holds nothing machine-local.
+STATE_PATH = "history_state.json"
+# Bumped when the manifest/history entry format changes; a build state with another
+# version triggers a full rebuild of both files from note/.
+STATE_VERSION = 2
+# Local, uncommitted [size, mtime, sha1] per note file: files untouched since the last
+# build on this machine are not even re-read. mtimes change with every checkout, which
+# is why they are kept out of STATE_PATH (and out of git).
+MTIME_CACHE_PATH = ".history_mtimes.json"
+
+# Sharded history: history/<CODE>/<YYYY-MM>.json plus a small history/index.json
+# listing each shard's draw count and date range, so clients fetch only what they need.
+SHARD_DIR = "history"
+SHARD_INDEX_PATH = os.path.join(SHARD_DIR, "index.json")
 
 def load_existing_manifest():
     """Load existing manifest or create empty one."""
@@ -35,23 +62,173 @@ def load_existing_history():
 def save_manifest(manifest):
     """Save manifest to file."""
     try:
-        with open("result_manifest.json", 'w', encoding='utf-8') as f:
-            # Save as a list directly, not as a dict with "results" key
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        print("Manifest written successfully")
+        # Save as a list directly, not as a dict with "results" key
+        if write_json_if_changed("result_manifest.json", manifest):
+            print("Manifest written successfully")
+        else:
+            print("Manifest unchanged")
     except Exception as e:
         print(f"Error saving manifest: {e}")
 
 def save_history(history):
     """Save history to file."""
     try:
-        with open("history.json", 'w', encoding='utf-8') as f:
-            # Save as a list directly, not as a dict with "draws" key
-            json.dump(history, f, indent=2, ensure_ascii=False)
-        print("History written successfully")
+        # Save as a list directly, not as a dict with "draws" key
+        if write_json_if_changed("history.json", history):
+            print("History written successfully")
+        else:
+            print("History unchanged")
     except Exception as e:
         print(f"Error saving history: {e}")
 
+def load_build_state() -> Dict[str, Any]:
+    """Load the state recorded by the previous build: per-file stats and shard hashes."""
+    # Without a usable state every file counts as new, so both files are rebuilt from note/
+    state: Dict[str, Any] = {"files": {}, "shards": {}, "rebuild": True}
+    if os.path.exists(STATE_PATH):
+        try:
+            with open(STATE_PATH, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except Exception as e:
+            print(f"Error loading build state: {e}")
+            return state
+        state["shards"] = saved.get("shards", {})
+        if saved.get("version") == STATE_VERSION:
+            state["files"] = saved.get("files", {})
+            state["rebuild"] = False
+        else:
+            print(f"Build state version {saved.get('version')} != {STATE_VERSION}; rebuilding manifest and history")
+    return state
+
+def save_build_state(state: Dict[str, Any]):
+    saved = {"version": STATE_VERSION}
+    saved.update((key, dict(sorted(state[key].items()))) for key in ("files", "shards"))
+    try:
+        write_json_if_changed(STATE_PATH, saved, indent=1)
+    except Exception as e:
+        print(f"Error saving build state: {e}")
+
+def load_mtime_cache() -> Dict[str, List[Any]]:
+    try:
+        with open(MTIME_CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_mtime_cache(mtimes: Dict[str, List[Any]], files: Dict[str, Dict[str, Any]]):
+    try:
+        write_json_if_changed(MTIME_CACHE_PATH, {f: mtimes[f] for f in sorted(files) if f in mtimes},
+                              indent=None, separators=(",", ":"))
+    except Exception as e:
+        print(f"Error saving mtime cache: {e}")
+
+def shard_key(entry: Dict[str, Any]) -> Tuple[str, str]:
+    """(lottery code, YYYY-MM) shard of a history entry."""
+    code = entry.get("lottery") or ""
+    if not re.match(r'^[A-Z]{2,3}$', code):
+        file_info = parse_filename(entry.get("filename", ""))
+        code = file_info["lottery_code"] if file_info else "XX"
+    draw_date = entry.get("date") or ""
+    month = draw_date[:7] if re.match(r'^\d{4}-\d{2}', draw_date) else "unknown"
+    return code, month
+
+def save_history_shards(history: List[Dict[str, Any]], shard_hashes: Dict[str, str]) -> Dict[str, str]:
+    """Write history shards whose content changed, plus the shard index.
+
+    shard_hashes maps shard paths (relative to SHARD_DIR) to the SHA-1 recorded by the
+    previous build; the updated mapping is returned. Shards left without entries are removed.
+    """
+    shards: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for entry in history:
+        shards.setdefault(shard_key(entry), []).append(entry)
+
+    new_hashes: Dict[str, str] = {}
+    index = []
+    written = 0
+    for (code, month), entries in sorted(shards.items()):
+        rel_path = f"{code}/{month}.json"
+        path = os.path.join(SHARD_DIR, code, f"{month}.json")
+        payload = json.dumps(entries, indent=2, ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha1(payload).hexdigest()
+        if shard_hashes.get(rel_path) != digest or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if write_bytes_if_changed(path, payload):
+                written += 1
+        new_hashes[rel_path] = digest
+        dates = sorted(e.get("date") or "" for e in entries)
+        index.append({
+            "shard": rel_path,
+            "code": code,
+            "month": month,
+            "draws": len(entries),
+            "from": dates[0],
+            "to": dates[-1]
+        })
+
+    for rel_path in set(shard_hashes) - set(new_hashes):
+        try:
+            os.remove(os.path.join(SHARD_DIR, rel_path))
+        except OSError:
+            pass
+
+    index_changed = write_json_if_changed(SHARD_INDEX_PATH, {"draws": len(history), "shards": index})
+    print(f"History shards: {len(new_hashes)} total, {written} written{', index updated' if index_changed else ''}")
+    return new_hashes
+
+def load_history_from_shards() -> Optional[List[Dict[str, Any]]]:
+    """Reassemble the full history from its shards; None when no shard index exists."""
+    try:
+        with open(SHARD_INDEX_PATH, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        history = []
+        for shard in index.get("shards", []):
+            with open(os.path.join(SHARD_DIR, shard["shard"]), 'r', encoding='utf-8') as f:
+                history.extend(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"Could not load history shards: {e}")
+        return None
+    history.sort(key=lambda x: x["date"], reverse=True)
+    return history
+
+def scan_note_files(note_dir: str, state: Dict[str, Dict[str, Any]],
+                    mtimes: Dict[str, List[Any]]) -> Tuple[List[Tuple[str, bytes, str]], Dict[str, Dict[str, Any]]]:
+    """Find note files that are new or whose content changed since the last build.
+
+    Files whose size and mtime match the local mtime cache for the recorded hash are
+    not opened at all; others are read and hashed, and only a differing hash counts
+    as a change. mtimes is updated in place for files found unchanged.
+    Returns ([(filename, raw bytes, sha1)], state for unchanged files).
+    """
+    changed = []
+    current: Dict[str, Dict[str, Any]] = {}
+    for filename in sorted(os.listdir(note_dir)):
+        if not filename.endswith('.json') or filename == 'latest.json':
+            continue
+        filepath = os.path.join(note_dir, filename)
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            continue
+        prev = state.get(filename)
+        if prev and mtimes.get(filename) == [st.st_size, st.st_mtime_ns, prev.get("sha1")]:
+            current[filename] = prev
+            continue
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if prev and prev.get("sha1") == digest:
+            # Touched (e.g. fresh checkout) but identical content
+            current[filename] = {"size": st.st_size, "sha1": digest}
+            mtimes[filename] = [st.st_size, st.st_mtime_ns, digest]
+            continue
+        changed.append((filename, raw, digest))
+    return changed, current
+
+def file_state(note_dir: str, filename: str, digest: str, mtimes: Dict[str, List[Any]]) -> Dict[str, Any]:
+    st = os.stat(os.path.join(note_dir, filename))
+    mtimes[filename] = [st.st_size, st.st_mtime_ns, digest]
+    return {"size": st.st_size, "sha1": digest}
+
 def parse_filename(filename: str) -> Optional[Dict[str, str]]:
     """Parse filename to extract lottery code, draw number, and date."""
     # Expected format: XX-XXX-YYYY-MM-DD.json
@@ -65,88 +242,172 @@ def parse_filename(filename: str) -> Optional[Dict[str, str]]:
         }
     return None
 
-def process_manual_uploads():
-    """Process manually uploaded JSON files and update manifest/history."""
+GITHUB_RAW_URL = "https://raw.githubusercontent.com/santhkhd/kerala_loto/main/note/"
+FOUR_DIGIT_PRIZES = ("4th_prize", "5th_prize", "6th_prize", "7th_prize", "8th_prize", "9th_prize")
+SIX_DIGIT_PRIZES = ("1st_prize", "2nd_prize", "3rd_prize", "consolation_prize")
+NAME_CODE_RE = re.compile(r'\(([A-Z]{2,3})\)')
+FILE_CODE_RE = re.compile(r'^([A-Z]{2,3})-')
+FOUR_DIGITS_RE = re.compile(r'\b(\d{4})\b')
+SIX_DIGITS_RE = re.compile(r'\b(\d{6})\b')
+
+def build_history_entry(filename: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a history entry with the same structure and values as generate-history.js."""
+    lottery = ""
+    code_match = NAME_CODE_RE.search(str(data.get("lottery_name") or ""))
+    if code_match:
+        lottery = code_match.group(1)
+    if not lottery:
+        file_match = FILE_CODE_RE.match(filename)
+        lottery = file_match.group(1) if file_match else ""
+
+    prizes = []
+    # Ordered sets of the numbers used by the prediction page
+    numbers4: Dict[str, None] = {}
+    numbers6: Dict[str, None] = {}
+    for prize_key, prize_data in (data.get("prizes") or {}).items():
+        # Debug: Check types
+        if not isinstance(prize_data, dict):
+            print(f"ERROR: prize_data is not a dict! Type: {type(prize_data)}, Value: {prize_data}")
+            continue
+        winners = prize_data.get("winners")
+        winners = winners if isinstance(winners, list) else []
+        prizes.append({
+            "prize_key": prize_key,
+            "label": prize_data.get("label") or "",
+            "amount": prize_data.get("amount") or 0,
+            "winners": winners
+        })
+        # Per-tier flag of draws published while still being announced
+        if isinstance(prize_data.get("complete"), bool):
+            prizes[-1]["complete"] = prize_data["complete"]
+        if prize_key in FOUR_DIGIT_PRIZES:
+            for w in winners:
+                m = FOUR_DIGITS_RE.search(str(w))
+                if m:
+                    numbers4[m.group(1)] = None
+        elif prize_key in SIX_DIGIT_PRIZES:
+            for w in winners:
+                m = SIX_DIGITS_RE.search(str(w))
+                if m:
+                    numbers6[m.group(1)] = None
+
+    draw_number = data.get("draw_number")
+    return {
+        "date": data.get("draw_date") or "",
+        "lottery": lottery,
+        "draw": str(draw_number).rjust(2, "0") if draw_number else "",
+        "filename": filename,
+        # encodeURIComponent-compatible quoting, as in generate-history.js
+        "github_url": GITHUB_RAW_URL + quote(filename, safe="!*'()"),
+        "prizes": prizes,
+        "numbers4": list(numbers4),
+        "numbers6": list(numbers6),
+        "downloadLink": data.get("downloadLink") or ""
+    }
+
+def build_entries(filename: str, file_info: Dict[str, str], data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Build the manifest and history entries for one note file."""
+    manifest_entry = {
+        "code": file_info["lottery_code"],
+        "draw_number": file_info["draw_number"],
+        "date": file_info["date"],
+        "filename": filename
+    }
+
+    history_entry = build_history_entry(filename, data)
+    return manifest_entry, history_entry
+
+def process_manual_uploads(write_monolithic: bool = True):
+    """Process new and changed note files and update manifest/history incrementally.
+
+    Only files that are new or whose content hash changed since the last build (see
+    scan_note_files) are read. New draws are appended; changed draws replace their
+    existing entries in place. Manifest and history are loaded only when there is
+    something to do, and are rewritten only if their serialized content changes.
+
+    History is also written as shards under history/; with write_monolithic=False
+    the shards are the only history output and history.json is left untouched.
+    """
     note_dir = "note"
     if not os.path.exists(note_dir):
         print("Note directory doesn't exist")
         return
+
+    state = load_build_state()
+    mtimes = load_mtime_cache()
+    changed, new_state = scan_note_files(note_dir, state["files"], mtimes)
+    shards_missing = not os.path.exists(SHARD_INDEX_PATH)
+    index_missing = not os.path.exists(ticket_index.INDEX_DIR)
+    stats_missing = bool(STATS_PATH) and not os.path.exists(STATS_PATH)
+    if not changed and not (shards_missing or index_missing or stats_missing):
+        state["files"] = new_state
+        save_build_state(state)
+        save_mtime_cache(mtimes, new_state)
+        print("No new or changed files to process")
+        return
+
+    # Load existing data; a rebuild starts from nothing, as every file is re-read
+    if state.get("rebuild"):
+        manifest, history = [], []
+    else:
+        manifest = load_existing_manifest()
+        history = None if write_monolithic else load_history_from_shards()
+        if history is None:
+            history = load_existing_history()
     
-    # Load existing data
-    manifest = load_existing_manifest()
-    history = load_existing_history()
-    
-    # Get existing filenames in manifest to avoid duplicates
-    existing_files = {result["filename"] for result in manifest}
-    
-    # Process each JSON file in note directory
-    note_files = [f for f in os.listdir(note_dir) if f.endswith('.json') and f != 'latest.json']
+    # Positions of already ingested files, so changed draws are replaced in place
+    manifest_index = {result["filename"]: i for i, result in enumerate(manifest)}
+    history_index = {entry.get("filename"): i for i, entry in enumerate(history)}
     
     new_entries = []
-    for filename in note_files:
-        if filename in existing_files:
-            continue  # Skip existing entries
-            
-        filepath = os.path.join(note_dir, filename)
+    updated_entries = []
+    for filename, raw, digest in changed:
         try:
             # Parse filename
             file_info = parse_filename(filename)
             if not file_info:
                 print(f"Skipping invalid filename format: {filename}")
+                new_state[filename] = file_state(note_dir, filename, digest, mtimes)
                 continue
                 
             # Load file content
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Create manifest entry
-            manifest_entry = {
-                "filename": filename,
-                "lottery_code": file_info["lottery_code"],
-                "draw_number": file_info["draw_number"],
-                "date": file_info["date"],
-                "title": f"{data.get('lottery_name', 'Unknown')} {file_info['lottery_code']}-{file_info['draw_number']}"
-            }
-            manifest.append(manifest_entry)
-            
-            # Create history entry (matching the structure from generate-history.js)
-            history_entry = {
-                "date": file_info["date"],
-                "lottery": data.get("lottery_name", "Unknown"),
-                "draw": file_info["draw_number"],
-                "filename": filename,
-                "github_url": f"https://raw.githubusercontent.com/santhkhd/kerala_loto/main/note/{filename}",
-                "prizes": [],
-                "numbers4": [],
-                "numbers6": [],
-                "downloadLink": data.get("downloadLink", "")
-            }
+            data = json.loads(raw.decode('utf-8'))
             
-            # Add prize information
-            prizes = data.get("prizes", {})
-            for prize_key, prize_data in prizes.items():
-                # Debug: Check types
-                if not isinstance(prize_data, dict):
-                    print(f"ERROR: prize_data is not a dict! Type: {type(prize_data)}, Value: {prize_data}")
-                    continue
-                    
-                history_entry["prizes"].append({
-                    "prize_key": prize_key,
-                    "label": prize_data.get("label", prize_key),
-                    "amount": prize_data.get("amount", 0),
-                    "winners": prize_data.get("winners", [])
-                })
-            
-            history.append(history_entry)
-            new_entries.append(filename)
-            print(f"Processed: {filename}")
+            manifest_entry, history_entry = build_entries(filename, file_info, data)
+            if filename in manifest_index:
+                # Re-ingest a changed draw (e.g. placeholder re-scraped with real winners)
+                updated = False
+                i = history_index.get(filename)
+                if i is not None and history[i] != history_entry:
+                    history[i] = history_entry
+                    updated = True
+                j = manifest_index[filename]
+                if manifest[j] != manifest_entry:
+                    manifest[j] = manifest_entry
+                    updated = True
+                if updated:
+                    updated_entries.append(filename)
+                    print(f"Updated: {filename}")
+            else:
+                manifest.append(manifest_entry)
+                # The draw may already be in history without a manifest entry
+                i = history_index.get(filename)
+                if i is not None:
+                    history[i] = history_entry
+                else:
+                    history.append(history_entry)
+                    history_index[filename] = len(history) - 1
+                manifest_index[filename] = len(manifest) - 1
+                new_entries.append(filename)
+                print(f"Processed: {filename}")
+            new_state[filename] = file_state(note_dir, filename, digest, mtimes)
             
         except Exception as e:
             print(f"Error processing {filename}: {e}")
             import traceback
             traceback.print_exc()
     
-    if new_entries:
+    if new_entries or updated_entries:
         # Sort manifest by date (newest first)
         manifest.sort(key=lambda x: x["date"], reverse=True)
         
@@ -155,13 +416,27 @@ def process_manual_uploads():
         
         # Save updated files
         save_manifest(manifest)
-        save_history(history)
+        if write_monolithic:
+            save_history(history)
         
         print(f"Added {len(new_entries)} new entries:")
         for entry in new_entries:
             print(f"  - {entry}")
+        if updated_entries:
+            print(f"Re-ingested {len(updated_entries)} changed entries:")
+            for entry in updated_entries:
+                print(f"  - {entry}")
     else:
-        print("No new files to process")
+        print("No new or changed files to process")
+    if new_entries or updated_entries or shards_missing:
+        state["shards"] = save_history_shards(history, state["shards"])
+    if new_entries or updated_entries or index_missing:
+        ticket_index.build_index(history)
+    if update_stats and (new_entries or updated_entries or stats_missing):
+        update_stats(history)
+    state["files"] = new_state
+    save_build_state(state)
+    save_mtime_cache(mtimes, new_state)
 
 def update_latest_result():
     """Update latest.json with the most recent result."""
@@ -199,18 +474,24 @@ def update_latest_result():
         with open(source_path, 'r', encoding='utf-8') as src:
             data = json.load(src)
         
-        with open(dest_path, 'w', encoding='utf-8') as dst:
-            json.dump(data, dst, indent=2, ensure_ascii=False)
-        
-        print(f"Updated latest.json with {latest_filename}")
+        if write_json_if_changed(dest_path, data):
+            print(f"Updated latest.json with {latest_filename}")
+        else:
+            print(f"latest.json already matches {latest_filename}")
     except Exception as e:
         print(f"Error updating latest.json: {e}")
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Update manifest and history from note/ files.")
+    parser.add_argument("--no-monolithic", action="store_true",
+                        help="write only the history/ shards, not history.json")
+    args = parser.parse_args()
+
     print("Processing manually uploaded JSON files...")
     
     # Process new files and update manifest/history
-    process_manual_uploads()
+    process_manual_uploads(write_monolithic=not args.no_monolithic)
     
     # Update latest.json
     update_latest_result()
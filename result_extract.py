@@ -0,0 +1,314 @@
+"""Shared result-page extraction used by updateloto.py, main.py and lottery_scraper.py.
+
+extract_result(soup, url, page_text) -> (data, filename) turns a parsed
+kllotteryresult.com page into the note JSON structure and its note/ filename.
+All patterns are compiled once at import, prize headings are classified with a
+single regex lookup (memoised per label), and the result table is walked once.
+"""
+import re
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import Tag
+
+BASE_URL = "https://www.kllotteryresult.com"
+PLACEHOLDER_WINNER = "Please wait, results will be published at 3 PM."
+
+prize_amounts = {
+    "1st_prize": 10000000, "consolation_prize": 5000, "2nd_prize": 3000000,
+    "3rd_prize": 500000, "4th_prize": 5000, "5th_prize": 2000,
+    "6th_prize": 1000, "7th_prize": 500, "8th_prize": 200, "9th_prize": 100
+}
+standard_labels = {
+    "1st_prize": "1st Prize", "consolation_prize": "Consolation Prize",
+    "2nd_prize": "2nd Prize", "3rd_prize": "3rd Prize", "4th_prize": "4th Prize",
+    "5th_prize": "5th Prize", "6th_prize": "6th Prize", "7th_prize": "7th Prize",
+    "8th_prize": "8th Prize", "9th_prize": "9th Prize"
+}
+
+# Prize headings ("1st Prize Rs :10000000/-", "Cons Prize-Rs :5000/-", ...) map to a tier
+# through the first tier token they contain.
+PRIZE_TOKEN_RE = re.compile(r"1st|Cons|2nd|3rd|[4-9]th")
+PRIZE_TOKENS = {
+    "1st": "1st_prize", "Cons": "consolation_prize", "2nd": "2nd_prize", "3rd": "3rd_prize",
+    "4th": "4th_prize", "5th": "5th_prize", "6th": "6th_prize", "7th": "7th_prize",
+    "8th": "8th_prize", "9th": "9th_prize",
+}
+# Plain-text fallback: section headers at the start of a line
+PLAIN_HEADER_RE = re.compile(r"^(1st|Cons(?:olation)?|2nd|3rd|[4-9]th) Prize", re.I)
+PLAIN_WINNER_RE = re.compile(r"[A-Z]{1,3}\s*\d{4,6}|\b\d{4,6}\b")
+WHITESPACE_RE = re.compile(r"\s+")
+
+NUMERIC_DATE_RE = re.compile(r"(\d{2})[./-](\d{2})[./-](\d{4})")
+MONTH_NAMES = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)"
+DAY_MONTH_YEAR_RE = re.compile(rf"\b\d{{1,2}}\s+{MONTH_NAMES}\s+\d{{4}}\b", re.I)
+MONTH_DAY_YEAR_RE = re.compile(rf"\b{MONTH_NAMES}\s+\d{{1,2}},\s*\d{{4}}\b", re.I)
+TEXT_DATE_FORMATS = ["%d %B %Y", "%d %b %Y", "%b %d, %Y", "%B %d, %Y", "%d-%b-%Y", "%d-%B-%Y"]
+
+PAREN_RE = re.compile(r"\(([^)]+)\)")
+NAME_RE = re.compile(r"([A-Za-z\s]+)\s*\(")
+TITLE_CODE_RE = re.compile(r"\(([A-Z]{2,3})(?:-\d+)?\)")
+URL_DRAW_RE = re.compile(r"kerala-lottery-result-([A-Z]{2,3})-(\d+)", re.I)
+TEXT_CODE_RE = re.compile(r"\b([A-Z]{1,3})\s*\d{4,6}\b")
+VENUE_STRING_RE = re.compile(r"Venue|At", re.I)
+VENUE_RE = re.compile(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)")
+SIX_DIGITS_RE = re.compile(r"\d{6}")
+FOUR_DIGITS_RE = re.compile(r"\d{4}")
+DOWNLOAD_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+GENERIC_TITLES = ("lottery results", "kerala lottery results")
+
+
+def parse_date_from_text(text: str) -> Optional[date]:
+    """Extract a date from text supporting multiple formats."""
+    # Common numeric formats: 16-09-2025, 16/09/2025, 16.09.2025
+    m = NUMERIC_DATE_RE.search(text)
+    if m:
+        try:
+            return date(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+        except ValueError:
+            pass
+    # Textual month formats: 16 September 2025, 16 Sep 2025, Sep 16, 2025
+    candidates = [m2.group(0) for m2 in DAY_MONTH_YEAR_RE.finditer(text)]
+    candidates += [m3.group(0) for m3 in MONTH_DAY_YEAR_RE.finditer(text)]
+    for cand in candidates:
+        for fmt in TEXT_DATE_FORMATS:
+            try:
+                return datetime.strptime(cand, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+@lru_cache(maxsize=256)
+def classify_prize_label(label: str) -> Optional[str]:
+    """Map a prize heading to its tier key (e.g. "Cons Prize-Rs :5000/-" -> consolation_prize)."""
+    m = PRIZE_TOKEN_RE.search(label)
+    return PRIZE_TOKENS[m.group(0)] if m else None
+
+
+def new_tier(key: str, label: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "amount": prize_amounts.get(key, 0),
+        "label": standard_labels.get(key, label or key.replace('_', ' ').title()),
+        "winners": []
+    }
+
+
+def extract_title(result_soup) -> str:
+    title_tag = result_soup.find("h1")
+    if title_tag and title_tag.text.strip().lower() not in GENERIC_TITLES:
+        return title_tag.text.strip()
+    for tag in ["title", "h2", "h3"]:
+        t = result_soup.find(tag)
+        if t and t.text.strip():
+            return t.text.strip()
+    return "Unknown Lottery"
+
+
+def parse_table_prizes(result_soup) -> Dict[str, Dict[str, Any]]:
+    """Fill every tier from the results table in one pass over its rows."""
+    prizes: Dict[str, Dict[str, Any]] = {}
+    result_table = result_soup.find("table", class_="w-full")
+    if not isinstance(result_table, Tag):
+        return prizes
+    current: Optional[List[str]] = None
+    for row in result_table.find_all("tr"):
+        th = row.find("th")
+        if th:
+            label = th.get_text(strip=True)
+            key = classify_prize_label(label)
+            if key:
+                prizes[key] = new_tier(key, label)
+                current = prizes[key]["winners"]
+        if current is not None:
+            for td in row.find_all("td"):
+                number = td.get_text(strip=True)
+                if number:
+                    current.append(number)
+    return prizes
+
+
+def parse_plaintext_prizes(txt: str) -> Dict[str, Dict[str, Any]]:
+    """Fallback for pages without a results table (e.g. r.jina.ai text)."""
+    parsed: Dict[str, Dict[str, Any]] = {}
+    current: Optional[List[str]] = None
+    for ln in txt.splitlines():
+        ln = WHITESPACE_RE.sub(" ", ln).strip()
+        if not ln:
+            continue
+        header = PLAIN_HEADER_RE.search(ln)
+        if header:
+            token = header.group(1)
+            key = PRIZE_TOKENS["Cons" if token.lower().startswith("cons") else token.lower()]
+            if key not in parsed:
+                parsed[key] = new_tier(key)
+            current = parsed[key]["winners"]
+            continue
+        if current is None or ln in ("**", "..."):
+            continue
+        # Extract tokens like 'DD 781756' or plain 4-6 digit numbers
+        current.extend(t.strip() for t in PLAIN_WINNER_RE.findall(ln))
+    return parsed
+
+
+def fill_placeholders(prizes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Use the 3 PM placeholder for tiers without winners (or for all tiers if none are real)."""
+    if not prizes:
+        for key in standard_labels:
+            prizes[key] = new_tier(key)
+            prizes[key]["winners"].append(PLACEHOLDER_WINNER)
+        return prizes
+    has_actual_winners = any(
+        w != PLACEHOLDER_WINNER and w != "***"
+        for prize in prizes.values() for w in prize["winners"]
+    )
+    for prize in prizes.values():
+        if not has_actual_winners:
+            prize["winners"] = [PLACEHOLDER_WINNER]
+        elif not prize["winners"]:
+            prize["winners"].append(PLACEHOLDER_WINNER)
+    return prizes
+
+
+def is_placeholder(winner) -> bool:
+    text = str(winner)
+    return "***" in text or "Please wait" in text
+
+
+def winners_complete(winners) -> bool:
+    """A tier is complete once it has winners and none of them is a placeholder."""
+    return bool(winners) and not any(is_placeholder(w) for w in winners)
+
+
+def mark_complete_tiers(prizes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Set each tier's "complete" flag from its winners."""
+    for prize in prizes.values():
+        prize["complete"] = winners_complete(prize.get("winners") or [])
+    return prizes
+
+
+def draw_complete(data) -> bool:
+    """True when every tier of a note file's data is complete.
+
+    Uses the per-tier "complete" flags, falling back to the winners for files
+    saved before the flags existed.
+    """
+    prizes = (data.get("prizes") if isinstance(data, dict) else None) or {}
+    return bool(prizes) and all(
+        isinstance(prize, dict) and (
+            prize["complete"] if isinstance(prize.get("complete"), bool)
+            else winners_complete(prize.get("winners") or [])
+        )
+        for prize in prizes.values()
+    )
+
+
+def has_real_winners(prizes) -> bool:
+    """True when at least one tier already lists a real winning number."""
+    return any(
+        not is_placeholder(w) and FOUR_DIGITS_RE.search(str(w))
+        for p_data in (prizes or {}).values() for w in p_data.get("winners", [])
+    )
+
+
+def is_result_real(prizes) -> bool:
+    """Check if the result actually contains winning numbers, not just placeholders."""
+    if not prizes:
+        return False
+    winners = prizes.get("1st_prize", {}).get("winners", [])
+    if not winners:
+        return False
+    # If winners contain placeholders like '***' or 'Please wait', it's not real yet
+    if any("***" in w or "Please wait" in w for w in winners):
+        return False
+    # At least one valid-looking lottery number (e.g., "AB 123456")
+    return any(
+        SIX_DIGITS_RE.search(w)
+        for p_data in prizes.values() for w in p_data.get("winners", [])
+    )
+
+
+def extract_result(result_soup, result_url: str, result_page_text: Optional[str] = None,
+                   default_date: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    """Extract the result data from a parsed page; returns (data, note filename).
+
+    default_date (YYYY-MM-DD) is used when neither the title nor the page has a date.
+    """
+    page_text: Optional[str] = result_page_text
+
+    def text() -> str:
+        nonlocal page_text
+        if page_text is None:
+            page_text = result_soup.get_text("\n")
+        return page_text
+
+    title_text = extract_title(result_soup)
+    print(f"TITLE TEXT: '{title_text}'")
+
+    # Date from the title; fallback to the whole page, then to default_date
+    parsed_date = parse_date_from_text(title_text) or parse_date_from_text(text())
+    draw_date = parsed_date.strftime("%Y-%m-%d") if parsed_date else (default_date or "Unknown-Date")
+
+    draw_number_match = PAREN_RE.search(title_text)
+    draw_number = draw_number_match.group(1) if draw_number_match else "XX"
+
+    lottery_name_match = NAME_RE.search(title_text)
+    lottery_name = lottery_name_match.group(1).strip().upper() if lottery_name_match else "Unknown"
+
+    # Lottery code from the URL slug (kerala-lottery-result-BT-19), then the title,
+    # then the first winner-like token ('DD 781756') in the page
+    url_match = URL_DRAW_RE.search(result_url)
+    title_code_match = TITLE_CODE_RE.search(title_text)
+    if url_match:
+        lottery_code = url_match.group(1).upper()
+        if draw_number == "XX":
+            draw_number = url_match.group(2)
+    elif title_code_match:
+        lottery_code = title_code_match.group(1)
+    else:
+        mcode = TEXT_CODE_RE.search(text())
+        lottery_code = mcode.group(1) if mcode else "XX"
+
+    # Try to extract venue
+    venue = ""
+    venue_tag = result_soup.find(string=VENUE_STRING_RE)
+    if venue_tag and isinstance(venue_tag, str):
+        venue_match = VENUE_RE.search(venue_tag.strip())
+        if venue_match:
+            venue = venue_match.group(1).strip()
+
+    # Get download link
+    download_link = ""
+    for a_tag in result_soup.find_all("a", href=True):
+        href = a_tag["href"]
+        if href.lower().endswith(DOWNLOAD_EXTENSIONS):
+            download_link = href if href.startswith("http") else BASE_URL + href
+            break
+
+    prizes = parse_table_prizes(result_soup)
+    if not prizes or all(not section["winners"] for section in prizes.values()):
+        # Normalize page text from soup to better capture headings and lines
+        parsed_plain = parse_plaintext_prizes(result_soup.get_text("\n", strip=True))
+        if parsed_plain:
+            prizes = parsed_plain
+            print("Parsed winners using plaintext fallback.")
+    fill_placeholders(prizes)
+    mark_complete_tiers(prizes)
+
+    data = {
+        "lottery_name": lottery_name,
+        "draw_number": draw_number,
+        "draw_date": draw_date,
+        "venue": venue,
+        "prizes": prizes,
+        "complete": all(prize["complete"] for prize in prizes.values()),
+        "downloadLink": download_link
+    }
+
+    # Filename like SS-485-2025-09-16.json; drop the code prefix from draw numbers like "SS-485"
+    clean_draw_number = draw_number
+    if draw_number.startswith(lottery_code + "-"):
+        clean_draw_number = draw_number[len(lottery_code) + 1:]
+    filename = f"{lottery_code}-{clean_draw_number}-{draw_date}.json"
+    return data, filename
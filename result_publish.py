@@ -0,0 +1,98 @@
+"""Progressive publishing of a draw while its tiers are still being announced.
+
+Results come out tier by tier, so a scrape during the draw usually sees the 1st prize
+and consolation numbers while the lower tiers still read "***". publish_result()
+saves whatever has been parsed so far instead of waiting for the whole page:
+
+    note/<draw>.json   the draw with per-tier "complete" flags (written only on change)
+    note/latest.json   the same draw, unless latest.json already holds a newer one
+    live_delta.json    only the tiers that changed since the previous save, plus the
+                       lists of published and pending tiers, for clients polling
+                       during the draw
+
+publish_result() itself writes no derived files. Its callers run build_artifacts.build_all()
+after each publish (the scheduler after every scrape, live_watcher after every change);
+its incremental stage re-reads only the changed note file and updates history.json, the
+shards, the ticket index and stats from it.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import pytz
+
+from atomic_io import write_json_if_changed
+
+IST = pytz.timezone('Asia/Kolkata')
+NOTE_DIR = "note"
+LIVE_DELTA_PATH = "live_delta.json"
+
+
+def load_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def valid_date(value: Any) -> bool:
+    try:
+        datetime.strptime(str(value), "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def changed_tiers(previous: Optional[Dict[str, Any]], data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Tiers of data whose winners or completeness differ from the previously saved draw."""
+    before = (previous or {}).get("prizes") or {}
+    return {
+        key: prize for key, prize in (data.get("prizes") or {}).items()
+        if not isinstance(before.get(key), dict)
+        or before[key].get("winners") != prize.get("winners")
+        or before[key].get("complete") != prize.get("complete")
+    }
+
+
+def update_latest(data: Dict[str, Any], note_dir: str = NOTE_DIR) -> bool:
+    """Point note/latest.json at this draw unless it already holds a newer one."""
+    latest_path = os.path.join(note_dir, "latest.json")
+    latest = load_json(latest_path)
+    if latest and valid_date(latest.get("draw_date")):
+        if not valid_date(data.get("draw_date")) or data["draw_date"] < latest["draw_date"]:
+            return False
+    return write_json_if_changed(latest_path, data)
+
+
+def publish_result(data: Dict[str, Any], filename: str, note_dir: str = NOTE_DIR,
+                   delta_path: str = LIVE_DELTA_PATH) -> bool:
+    """Save a complete or partially announced draw; True when the note file changed."""
+    os.makedirs(note_dir, exist_ok=True)
+    path = os.path.join(note_dir, filename)
+    previous = load_json(path)
+    written = write_json_if_changed(path, data)
+    if update_latest(data, note_dir):
+        print(f"Latest result saved to: {os.path.abspath(os.path.join(note_dir, 'latest.json'))}")
+    if not written:
+        return False
+
+    prizes = data.get("prizes") or {}
+    delta = {
+        "filename": filename,
+        "lottery_name": data.get("lottery_name"),
+        "draw_number": data.get("draw_number"),
+        "draw_date": data.get("draw_date"),
+        "updated_at": datetime.now(IST).isoformat(timespec="seconds"),
+        "complete": bool(data.get("complete")),
+        "published": [key for key, prize in prizes.items() if prize.get("complete")],
+        "pending": [key for key, prize in prizes.items() if not prize.get("complete")],
+        "changed": changed_tiers(previous, data),
+    }
+    write_json_if_changed(delta_path, delta, indent=None, separators=(",", ":"))
+    if not delta["complete"]:
+        print(f"Published {len(delta['published'])}/{len(prizes)} tiers of {filename}; "
+              f"pending: {', '.join(delta['pending'])}")
+    return True
@@ -0,0 +1,161 @@
+"""Sorted in-memory index over result_manifest.json for range queries.
+
+Entries are kept in three sorted key lists so every query is a pair of bisects:
+
+    by_date       (date, code, draw, filename)   all codes, by date
+    by_code_date  (code, date, draw, filename)   one code, by date
+    by_code_draw  (code, draw, date, filename)   one code, by draw number
+
+refresh() reloads the manifest when its mtime or size changes. Entries that were
+only added are inserted with insort; anything else (an edited or removed entry)
+rebuilds the lists.
+"""
+import base64
+import bisect
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+MANIFEST_PATH = "result_manifest.json"
+HIGH = "\uffff"  # sorts after any date, code or filename
+
+
+def draw_int(value: Any) -> int:
+    try:
+        return int(str(value).split("-")[-1])
+    except ValueError:
+        return -1
+
+
+def encode_cursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """Inverse of encode_cursor; raises ValueError for anything that is not one of ours."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(key, list) or len(key) != 4:
+        raise ValueError("invalid cursor")
+    return tuple(key)
+
+
+class ResultsIndex:
+    def __init__(self, manifest_path: str = MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self._signature = None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.by_date: List[Tuple] = []
+        self.by_code_date: List[Tuple] = []
+        self.by_code_draw: List[Tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def keys_for(entry: Dict[str, Any]) -> Tuple[Tuple, Tuple, Tuple]:
+        code = entry.get("code") or entry.get("lottery_code") or ""
+        day = entry.get("date") or ""
+        draw = draw_int(entry.get("draw_number"))
+        filename = entry.get("filename") or ""
+        return (day, code, draw, filename), (code, day, draw, filename), (code, draw, day, filename)
+
+    def _insert(self, entry: Dict[str, Any]) -> None:
+        by_date, by_code_date, by_code_draw = self.keys_for(entry)
+        bisect.insort(self.by_date, by_date)
+        bisect.insort(self.by_code_date, by_code_date)
+        bisect.insort(self.by_code_draw, by_code_draw)
+        self.entries[entry.get("filename") or ""] = entry
+
+    def _rebuild(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        keys = [self.keys_for(e) for e in entries.values()]
+        self.entries = dict(entries)
+        self.by_date = sorted(k[0] for k in keys)
+        self.by_code_date = sorted(k[1] for k in keys)
+        self.by_code_draw = sorted(k[2] for k in keys)
+
+    def refresh(self) -> bool:
+        """Pick up manifest changes; returns True when the index changed."""
+        try:
+            st = os.stat(self.manifest_path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return False
+        with self._lock:
+            if signature == self._signature:
+                return False
+            entries: Dict[str, Dict[str, Any]] = {}
+            if signature is not None:
+                try:
+                    with open(self.manifest_path, "r", encoding="utf-8") as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Could not load {self.manifest_path}: {e}")
+                    return False
+                entries = {e.get("filename") or "": e for e in manifest if isinstance(e, dict)}
+            added = [f for f in entries if f not in self.entries]
+            unchanged = all(entries.get(f) == e for f, e in self.entries.items())
+            if unchanged and len(added) <= len(entries) // 2:
+                for filename in added:
+                    self._insert(entries[filename])
+                print(f"Results index: +{len(added)} entries ({len(self.entries)} total)")
+            else:
+                self._rebuild(entries)
+                print(f"Results index rebuilt: {len(self.entries)} entries")
+            self._signature = signature
+            return True
+
+    def query(self, code: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+              draw_from: Optional[int] = None, draw_to: Optional[int] = None, limit: int = 50,
+              cursor: Optional[str] = None, descending: bool = True) -> Dict[str, Any]:
+        """One page of matching entries plus the cursor for the next page (None on the last page).
+
+        With a code and a draw range the (code, draw) list is used; with a code alone the
+        (code, date) list; otherwise the date list. Dates are inclusive YYYY-MM-DD strings.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            if code and (draw_from is not None or draw_to is not None):
+                keys = self.by_code_draw
+                low = (code, -1 if draw_from is None else draw_from)
+                high = (code, 10 ** 9 if draw_to is None else draw_to, HIGH)
+                in_dates = (lambda k: (not date_from or k[2] >= date_from) and (not date_to or k[2] <= date_to))
+            elif code:
+                keys = self.by_code_date
+                low = (code, date_from or "")
+                high = (code, (date_to or HIGH) + HIGH)
+                in_dates = None
+            else:
+                keys = self.by_date
+                low = (date_from or "",)
+                high = ((date_to or HIGH) + HIGH,)
+                in_dates = None
+            lo = bisect.bisect_left(keys, low)
+            hi = bisect.bisect_right(keys, high)
+            total = hi - lo
+            if after is not None:
+                try:
+                    if descending:
+                        hi = min(hi, bisect.bisect_left(keys, after))
+                    else:
+                        lo = max(lo, bisect.bisect_right(keys, after))
+                except TypeError:
+                    # A cursor issued for a different kind of query
+                    raise ValueError("invalid cursor") from None
+            span = keys[lo:hi]
+            if descending:
+                span.reverse()
+            if in_dates is not None:
+                span = [k for k in span if in_dates(k)]
+                total = None
+            page = span[:limit]
+            results = [self.entries[k[-1]] for k in page]
+            next_cursor = encode_cursor(page[-1]) if len(span) > limit else None
+        return {"results": results, "count": len(results), "total": total, "next_cursor": next_cursor}
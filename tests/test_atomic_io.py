@@ -0,0 +1,21 @@
+from atomic_io import write_json_if_changed
+
+
+def test_write_json_if_changed(tmp_path):
+    path = tmp_path / "data.json"
+    assert write_json_if_changed(str(path), {"a": 1}) is True
+    assert write_json_if_changed(str(path), {"a": 1}) is False
+    assert write_json_if_changed(str(path), {"a": 2}) is True
+    assert path.read_text(encoding="utf-8") == '{\n  "a": 2\n}'
+
+
+def test_crlf_copy_counts_as_unchanged(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b'{\r\n  "a": 1\r\n}')
+    assert write_json_if_changed(str(path), {"a": 1}) is False
+    assert path.read_bytes() == b'{\r\n  "a": 1\r\n}'
+
+
+def test_no_temporary_files_are_left_behind(tmp_path):
+    write_json_if_changed(str(tmp_path / "data.json"), [1, 2, 3])
+    assert not [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
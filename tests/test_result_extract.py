@@ -0,0 +1,86 @@
+import pytest
+
+from html_parsing import backend_available, make_soup
+from result_extract import PLACEHOLDER_WINNER, draw_complete, extract_result, winners_complete
+
+URL = "https://www.kllotteryresult.com/kerala-lottery-result-BT-37"
+
+# Hand-written page in the layout of a kllotteryresult.com result page (not a saved copy)
+PAGE = """<html><head><title>Kerala Lottery Result BHAGYATHARA (BT-37) 12-01-2026</title></head>
+<body>
+<h1>BHAGYATHARA (BT-37) Lottery Result 12-01-2026</h1>
+<p>Venue: Gorky Bhavan, Thiruvananthapuram</p>
+<table class="w-full">
+<tr><th>1st Prize Rs :10000000/-</th></tr>
+<tr><td>BZ 783510</td></tr>
+<tr><th>Cons Prize-Rs :5000/-</th></tr>
+<tr><td>BA 783510</td><td>BB 783510</td></tr>
+<tr><th>2nd Prize Rs :3000000/-</th></tr>
+<tr><td>BK 120456</td></tr>
+<tr><th>4th Prize Rs :5000/-</th></tr>
+<tr><td>0505</td><td>1234</td></tr>
+<tr><td>5678</td></tr>
+</table>
+<a href="/downloads/BT-37.pdf">Download PDF</a>
+</body></html>"""
+
+PARTIAL_PAGE = PAGE.replace("<td>BK 120456</td>", "<td>***</td>")
+
+
+def extract(page, backend="html.parser"):
+    return extract_result(make_soup(page, backend), URL, page)
+
+
+def test_extract_result_reads_the_results_table():
+    data, filename = extract(PAGE)
+    assert filename == "BT-37-2026-01-12.json"
+    assert data["lottery_name"] == "BHAGYATHARA"
+    assert data["draw_number"] == "BT-37"
+    assert data["draw_date"] == "2026-01-12"
+    assert data["downloadLink"] == "https://www.kllotteryresult.com/downloads/BT-37.pdf"
+    prizes = data["prizes"]
+    assert list(prizes) == ["1st_prize", "consolation_prize", "2nd_prize", "4th_prize"]
+    assert prizes["1st_prize"]["winners"] == ["BZ 783510"]
+    assert prizes["consolation_prize"]["amount"] == 5000
+    assert prizes["4th_prize"]["winners"] == ["0505", "1234", "5678"]
+    assert data["complete"] is True
+    assert all(prize["complete"] for prize in prizes.values())
+
+
+def test_extract_result_flags_tiers_still_pending():
+    data, _ = extract(PARTIAL_PAGE)
+    assert data["prizes"]["2nd_prize"]["complete"] is False
+    assert data["prizes"]["1st_prize"]["complete"] is True
+    assert data["complete"] is False
+    assert not draw_complete(data)
+
+
+def test_extract_result_without_winners_uses_the_placeholder():
+    page = "<html><body><h1>BHAGYATHARA (BT-38) Lottery Result 19-01-2026</h1></body></html>"
+    data, filename = extract(page)
+    assert filename == "BT-38-2026-01-19.json"
+    assert all(prize["winners"] == [PLACEHOLDER_WINNER] for prize in data["prizes"].values())
+    assert data["complete"] is False
+
+
+@pytest.mark.skipif(not backend_available("lxml"), reason="lxml is not installed")
+@pytest.mark.parametrize("page", [PAGE, PARTIAL_PAGE], ids=["complete", "partial"])
+def test_backends_extract_the_same_result(page):
+    assert extract(page, "lxml") == extract(page, "html.parser")
+
+
+def test_winners_complete():
+    assert winners_complete(["BZ 783510"])
+    assert not winners_complete([])
+    assert not winners_complete(["BZ 783510", "***"])
+    assert not winners_complete([PLACEHOLDER_WINNER])
+
+
+def test_draw_complete_prefers_flags_and_falls_back_to_winners():
+    assert draw_complete({"prizes": {"1st_prize": {"winners": ["***"], "complete": True}}})
+    assert not draw_complete({"prizes": {"1st_prize": {"winners": ["BZ 783510"], "complete": False}}})
+    # Files saved before the flags existed
+    assert draw_complete({"prizes": {"1st_prize": {"winners": ["BZ 783510"]}}})
+    assert not draw_complete({"prizes": {"1st_prize": {"winners": ["***"]}}})
+    assert not draw_complete({"prizes": {}})
+    assert not draw_complete(None)
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from results_index import ResultsIndex, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = ("2026-01-05", "BT", 36, "BT-36-2026-01-05.json")
+    assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(("a", "b"))])
+def test_decode_cursor_rejects_foreign_input(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def index(tmp_path):
+    manifest = [
+        {"code": "BT", "draw_number": str(n), "date": f"2026-01-{n:02d}", "filename": f"BT-{n}-2026-01-{n:02d}.json"}
+        for n in range(1, 8)
+    ] + [{"code": "SS", "draw_number": "500", "date": "2026-01-03", "filename": "SS-500-2026-01-03.json"}]
+    path = tmp_path / "result_manifest.json"
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+    index = ResultsIndex(str(path))
+    index.refresh()
+    return index
+
+
+def test_pages_follow_the_cursor_without_gaps_or_repeats(index):
+    seen, cursor = [], None
+    while True:
+        page = index.query(limit=3, cursor=cursor)
+        seen += [e["filename"] for e in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 8
+    assert [f.split("-")[-1] for f in seen[:2]] == ["07.json", "06.json"]
+
+
+def test_code_and_draw_range_query(index):
+    page = index.query(code="BT", draw_from=3, draw_to=5, descending=False)
+    assert [e["draw_number"] for e in page["results"]] == ["3", "4", "5"]
+    assert page["next_cursor"] is None
+
@@ -0,0 +1,58 @@
+from ticket_index import TicketIndex, match_postings, parse_ticket
+
+SIX = [
+    ["BT-36-2026-01-05", "1st_prize", "BZ"],
+    ["BT-36-2026-01-05", "consolation_prize", "BA"],
+    ["BT-36-2026-01-05", "consolation_prize", "BB"],
+    ["SS-500-2026-01-06", "2nd_prize", "SA"],
+]
+FOUR = [["KR-700-2025-12-27", "5th_prize"]]
+
+
+def test_series_must_match_for_six_digit_tiers():
+    matches = match_postings("BZ", "783510", SIX, [])
+    assert [(m["draw"], m["prize_key"], m["match"]) for m in matches] == [
+        ("BT-36-2026-01-05", "1st_prize", "full"),
+    ]
+
+
+def test_number_without_series_reports_each_tier_once_per_draw():
+    matches = match_postings("", "783510", SIX, [])
+    assert [(m["draw"], m["prize_key"], m["match"]) for m in matches] == [
+        ("SS-500-2026-01-06", "2nd_prize", "number"),
+        ("BT-36-2026-01-05", "1st_prize", "number"),
+        ("BT-36-2026-01-05", "consolation_prize", "number"),
+    ]
+
+
+def test_last_four_digits_match_newest_first():
+    matches = match_postings("BZ", "783510", SIX, FOUR)
+    assert [m["match"] for m in matches] == ["full", "last4"]
+    last = matches[-1]
+    assert last == {
+        "draw": "KR-700-2025-12-27",
+        "filename": "KR-700-2025-12-27.json",
+        "lottery_code": "KR",
+        "draw_number": "700",
+        "date": "2025-12-27",
+        "prize_key": "5th_prize",
+        "match": "last4",
+    }
+
+
+def test_parse_ticket():
+    assert parse_ticket("bz 783510") == ("BZ", "783510")
+    assert parse_ticket("BZ-783510") == ("BZ", "783510")
+    assert parse_ticket("0505") == ("", "0505")
+    assert parse_ticket("12345") is None
+
+
+def test_index_check_round_trip():
+    index = TicketIndex()
+    index.add_draw("BT-36-2026-01-05.json", [
+        ("1st_prize", ["BZ 783510"]),
+        ("5th_prize", ["3510", "0505"]),
+    ])
+    assert [m["prize_key"] for m in index.check("BZ 783510")] == ["1st_prize", "5th_prize"]
+    assert index.check("BA 783510")[0]["match"] == "last4"
+    assert index.check("nothing") == []
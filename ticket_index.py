@@ -0,0 +1,235 @@
+"""Inverted ticket-number index over all draws.
+
+Maps every winning 6-digit number and every winning 4-digit ending to the draws and
+prize tiers where it appeared, so "has this ticket ever won, and where" is a dict
+lookup instead of a scan over the whole history.
+
+On disk the index is bucketed by the first two digits of the key:
+
+    ticket_index/index.json     bucket layout and draw count
+    ticket_index/6/NN.json      {"123456": [["BT-36-2026-01-05", "1st_prize", "BZ"], ...], ...}
+    ticket_index/4/NN.json      {"0505": [["BT-36-2026-01-05", "4th_prize"], ...], ...}
+
+so a lookup reads at most two small files. Usage:
+
+    python ticket_index.py build
+    python ticket_index.py check "BZ 783510" 123456 0505
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+INDEX_DIR = "ticket_index"
+BUCKET_DIGITS = 2
+
+# Tiers won by the full series + number, and tiers won by the last four digits
+SIX_DIGIT_PRIZES = ("1st_prize", "consolation_prize", "2nd_prize", "3rd_prize")
+FOUR_DIGIT_PRIZES = ("4th_prize", "5th_prize", "6th_prize", "7th_prize", "8th_prize", "9th_prize")
+
+WINNER_SIX_RE = re.compile(r"\b([A-Z]{1,3})?\s*(\d{6})\b")
+WINNER_FOUR_RE = re.compile(r"\b(\d{4})\b")
+TICKET_RE = re.compile(r"^\s*([A-Za-z]{1,3})?[\s-]*(\d{4}|\d{6})\s*$")
+DRAW_RE = re.compile(r"^([A-Z]{2,3})-(\d+)-(\d{4}-\d{2}-\d{2})$")
+
+
+def parse_ticket(ticket: str) -> Optional[Tuple[str, str]]:
+    """Split 'AB 123456', 'AB123456', '123456' or '0505' into (series, digits)."""
+    m = TICKET_RE.match(ticket)
+    if not m:
+        return None
+    return (m.group(1) or "").upper(), m.group(2)
+
+
+def bucket_of(key: str) -> str:
+    return key[:BUCKET_DIGITS]
+
+
+class TicketIndex:
+    """In-memory inverted index: 6-digit number / 4-digit ending -> postings."""
+
+    def __init__(self):
+        self.six: Dict[str, List[List[str]]] = {}
+        self.four: Dict[str, List[List[str]]] = {}
+        self.draws = 0
+
+    def add_draw(self, filename: str, prizes: Iterable[Tuple[str, List[Any]]]) -> None:
+        """Index one draw given its (prize_key, winners) pairs."""
+        draw = filename[:-5] if filename.endswith(".json") else filename
+        self.draws += 1
+        for prize_key, winners in prizes:
+            for w in winners or []:
+                w = str(w)
+                if prize_key in SIX_DIGIT_PRIZES:
+                    m = WINNER_SIX_RE.search(w)
+                    if m:
+                        self.six.setdefault(m.group(2), []).append([draw, prize_key, m.group(1) or ""])
+                elif prize_key in FOUR_DIGIT_PRIZES:
+                    m = WINNER_FOUR_RE.search(w)
+                    if m:
+                        self.four.setdefault(m.group(1), []).append([draw, prize_key])
+
+    @classmethod
+    def from_history(cls, history: List[Dict[str, Any]]) -> "TicketIndex":
+        """Build from history.json entries (prizes as a list of {prize_key, winners})."""
+        index = cls()
+        for entry in history:
+            index.add_draw(entry.get("filename", ""),
+                           ((p.get("prize_key", ""), p.get("winners", [])) for p in entry.get("prizes", [])))
+        return index
+
+    @classmethod
+    def from_note_dir(cls, note_dir: str = "note") -> "TicketIndex":
+        """Build straight from the note/*.json files (prizes as a dict keyed by tier)."""
+        index = cls()
+        for filename in sorted(os.listdir(note_dir)):
+            if not filename.endswith(".json") or not DRAW_RE.match(filename[:-5]):
+                continue
+            try:
+                with open(os.path.join(note_dir, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            prizes = data.get("prizes") or {}
+            index.add_draw(filename, ((k, v.get("winners", [])) for k, v in prizes.items() if isinstance(v, dict)))
+        return index
+
+    def check(self, ticket: str) -> List[Dict[str, Any]]:
+        parsed = parse_ticket(ticket)
+        if not parsed:
+            return []
+        series, digits = parsed
+        six = self.six.get(digits, []) if len(digits) == 6 else []
+        four = self.four.get(digits[-4:], [])
+        return match_postings(series, digits, six, four)
+
+    def write(self, index_dir: str = INDEX_DIR) -> int:
+        """Write the bucket files that changed; returns how many were written."""
+        from atomic_io import write_json_if_changed
+
+        written = 0
+        wanted = set()
+        for kind, table in (("6", self.six), ("4", self.four)):
+            buckets: Dict[str, Dict[str, List[List[str]]]] = {}
+            for key in sorted(table):
+                buckets.setdefault(bucket_of(key), {})[key] = sorted(table[key])
+            os.makedirs(os.path.join(index_dir, kind), exist_ok=True)
+            for bucket, postings in buckets.items():
+                path = os.path.join(index_dir, kind, f"{bucket}.json")
+                wanted.add(path)
+                if write_json_if_changed(path, postings, indent=None, separators=(",", ":")):
+                    written += 1
+            # Drop buckets that no longer have any key
+            for name in os.listdir(os.path.join(index_dir, kind)):
+                path = os.path.join(index_dir, kind, name)
+                if path not in wanted:
+                    os.remove(path)
+        write_json_if_changed(os.path.join(index_dir, "index.json"), {
+            "draws": self.draws,
+            "bucket_digits": BUCKET_DIGITS,
+            "numbers6": len(self.six),
+            "endings4": len(self.four),
+        })
+        return written
+
+
+def match_postings(series: str, digits: str, six: List[List[str]], four: List[List[str]]) -> List[Dict[str, Any]]:
+    """Turn postings for a ticket into match records.
+
+    6-digit tiers need the same number and, when the ticket has a series, the same
+    series; 4-digit tiers match on the last four digits.
+    """
+    matches = []
+    seen = set()
+    for draw, prize_key, winner_series in six:
+        if series and winner_series and series != winner_series:
+            continue
+        # Without a series, report each tier once per draw (consolation lists every series)
+        if (draw, prize_key) in seen:
+            continue
+        seen.add((draw, prize_key))
+        matches.append(match_record(draw, prize_key, "full" if series else "number"))
+    for draw, prize_key in four:
+        matches.append(match_record(draw, prize_key, "last4"))
+    matches.sort(key=lambda m: m["date"], reverse=True)
+    return matches
+
+
+def match_record(draw: str, prize_key: str, match: str) -> Dict[str, Any]:
+    m = DRAW_RE.match(draw)
+    code, number, draw_date = m.groups() if m else ("", "", "")
+    return {
+        "draw": draw,
+        "filename": f"{draw}.json",
+        "lottery_code": code,
+        "draw_number": number,
+        "date": draw_date,
+        "prize_key": prize_key,
+        "match": match,
+    }
+
+
+def _load_bucket(index_dir: str, kind: str, key: str) -> List[List[str]]:
+    path = os.path.join(index_dir, kind, f"{bucket_of(key)}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get(key, [])
+    except (OSError, ValueError):
+        return []
+
+
+def check_ticket(ticket: str, index_dir: str = INDEX_DIR) -> List[Dict[str, Any]]:
+    """Look a ticket up in the on-disk index, reading only the buckets it falls in."""
+    parsed = parse_ticket(ticket)
+    if not parsed:
+        raise ValueError(f"Not a ticket number: {ticket!r}")
+    series, digits = parsed
+    six = _load_bucket(index_dir, "6", digits) if len(digits) == 6 else []
+    four = _load_bucket(index_dir, "4", digits[-4:])
+    return match_postings(series, digits, six, four)
+
+
+def build_index(history: Optional[List[Dict[str, Any]]] = None, index_dir: str = INDEX_DIR) -> TicketIndex:
+    """Rebuild the on-disk index from history entries (history.json when not given)."""
+    if history is None:
+        from process_manual_uploads import load_existing_history
+        history = load_existing_history()
+    index = TicketIndex.from_history(history)
+    written = index.write(index_dir)
+    print(f"Ticket index: {index.draws} draws, {len(index.six)} numbers, "
+          f"{len(index.four)} endings, {written} bucket files written")
+    return index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query the winning ticket index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="rebuild the index from history.json")
+    check = sub.add_parser("check", help="check one or more tickets")
+    check.add_argument("tickets", nargs="+", help="e.g. 'AB 123456', 123456 or 0505")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_index(index_dir=args.index_dir)
+        return 0
+
+    for ticket in args.tickets:
+        try:
+            matches = check_ticket(ticket, args.index_dir)
+        except ValueError as e:
+            print(e)
+            continue
+        if not matches:
+            print(f"{ticket}: no wins")
+            continue
+        print(f"{ticket}: {len(matches)} win(s)")
+        for m in matches:
+            print(f"  {m['date']}  {m['lottery_code']}-{m['draw_number']}  {m['prize_key']}  ({m['match']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ import pytz
 import sys
 import time
 
+import build_artifacts
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +39,18 @@ def run_command(command, description):
         logging.error(f"Exception during {description}: {e}")
         return False
 
+def build_artifacts_step():
+    """Build all generated artifacts in-process and log how long each one took"""
+    logging.info("Starting: Artifact Build")
+    try:
+        timings = build_artifacts.build_all()
+        logging.info("Success: Artifact Build (" + ", ".join(
+            f"{name} {1000 * seconds:.0f}ms" for name, seconds in timings.items()) + ")")
+        return True
+    except Exception as e:
+        logging.error(f"Exception during Artifact Build: {e}")
+        return False
+
 def commit_and_push():
     """Commit and push changes to GitHub"""
     logging.info("Checking for changes to commit...")
@@ -73,14 +87,9 @@ def main():
     if not run_command([sys.executable, 'main.py'], "Lottery Scraper"):
         logging.warning("Scraper failed or had warnings, proceeding anyway...")
 
-    # 2. Generate Manifest (Important for the web app to see new results)
-    run_command(['node', 'generate-manifest.js'], "Manifest Generation")
-
-    # 3. Generate History
-    run_command(['node', 'generate-history.js'], "History Generation")
-
-    # 4. Generate PDF Links
-    run_command(['node', 'generate-pdf-links.js'], "PDF Link Generation")
+    # 2. Build manifest, history, latest.json and PDF links in one pass over note/
+    # (Important for the web app to see new results)
+    build_artifacts_step()
 
     # 4. Push to GitHub
     if commit_and_push():
@@ -1,14 +1,24 @@
 import os
-import json
-import re
 import sys
+import re
 import requests
-from bs4 import BeautifulSoup, Tag
 from datetime import datetime, time as dt_time, date
 from typing import Optional, List, Tuple, Dict, Any
 import pytz
 import time
-from urllib.parse import quote
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from page_store import PageStore
+from http_cache import ResponseCache
+from http_session import get_session
+from result_publish import publish_result
+from draw_index import KnownDraws, draw_from_url
+import draw_calendar
+from html_parsing import head_text, make_soup
+import result_extract
+from result_extract import parse_date_from_text
 
 # Define the Indian timezone
 IST = pytz.timezone('Asia/Kolkata')
@@ -24,6 +34,48 @@ HEADERS = {
 SCRAPER_API_KEY = os.environ.get('SCRAPERAPI_KEY', '').strip()
 SCRAPER_API_ENDPOINT = os.environ.get('SCRAPERAPI_ENDPOINT', 'http://api.scraperapi.com')
 
+# Concurrent discovery: number of result pages fetched in parallel, and the cap on
+# simultaneous requests to any single host (origin, proxy endpoint, r.jina.ai).
+# Set FETCH_WORKERS=1 to fall back to sequential fetching.
+FETCH_WORKERS = max(1, int(os.environ.get('FETCH_WORKERS', '8')))
+FETCH_PER_HOST = max(1, int(os.environ.get('FETCH_PER_HOST', '4')))
+
+# Pages fetched during this run, shared by discovery and processing so each result
+# page is downloaded once. PAGE_STORE_SPILL=1 spills pages past the memory bound to disk.
+PAGE_STORE = PageStore(spill=os.environ.get('PAGE_STORE_SPILL', '').strip() == '1')
+
+# Persistent conditional-request cache (ETag / Last-Modified) for direct fetches.
+# HTTP_CACHE=0 disables it. URLs answered with 304 during this run are recorded in
+# UNCHANGED_URLS so main() can skip re-parsing pages whose note file already exists.
+HTTP_CACHE = ResponseCache() if os.environ.get('HTTP_CACHE', '1').strip() != '0' else None
+UNCHANGED_URLS = set()
+
+# Draws already saved in note/, used to drop homepage candidates before fetching them
+KNOWN_DRAWS = KnownDraws('note')
+
+# Fetch the result pages predicted by the weekly draw calendar for the last
+# CALENDAR_DAYS days first. The homepage is still crawled for draws the calendar
+# cannot predict (bumper draws held on a regular draw day), with candidates already
+# in note/ dropped before fetching. DRAW_CALENDAR=0 only crawls the homepage.
+USE_DRAW_CALENDAR = os.environ.get('DRAW_CALENDAR', '1').strip() != '0'
+CALENDAR_DAYS = max(1, int(os.environ.get('CALENDAR_DAYS', '7')))
+# Today's page is not expected to carry today's draw before this time (IST)
+RESULT_TIME = dt_time(15, 0)
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+@contextmanager
+def host_slot(url: str):
+    """Hold one of the FETCH_PER_HOST request slots for the URL's host."""
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(FETCH_PER_HOST)
+    with slot:
+        yield
+
 def build_proxy_url(target_url: str) -> str:
     if not SCRAPER_API_KEY:
         return target_url
@@ -32,14 +84,33 @@ def build_proxy_url(target_url: str) -> str:
     query = urlencode({'api_key': SCRAPER_API_KEY, 'url': target_url})
     return f"{SCRAPER_API_ENDPOINT}?{query}"
 
-def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3) -> requests.Response:
-    """Try direct fetch first; on 403/429/5xx or network error, retry and fall back to proxy if configured."""
+def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3, use_cache: bool = True) -> requests.Response:
+    """Try direct fetch first; on 403/429/5xx or network error, retry and fall back to proxy if configured.
+
+    Direct fetches are conditional when HTTP_CACHE holds validators for the URL; a 304
+    answer returns the cached body as a 200 response with ``from_cache`` set.
+    """
+    cache = HTTP_CACHE if use_cache else None
+    request_headers = dict(headers)
+    if cache:
+        request_headers.update(cache.conditional_headers(url))
     last_exc = None
     for attempt in range(1, max_retries + 1):
         try:
-            res = requests.get(url, headers=headers, timeout=timeout)
+            with host_slot(url):
+                res = get_session().get(url, headers=request_headers, timeout=timeout)
+            if res.status_code == 304 and cache:
+                cached = cache.revalidated(url, res)
+                if cached is not None:
+                    UNCHANGED_URLS.add(url)
+                    return cached
+                # Cached body disappeared meanwhile: refetch unconditionally
+                request_headers = dict(headers)
+                raise requests.exceptions.RequestException("HTTP 304 without cached body")
             if res.status_code in (403, 429) or res.status_code >= 500:
                 raise requests.exceptions.RequestException(f"HTTP {res.status_code}")
+            if cache:
+                cache.store(url, res)
             return res
         except requests.exceptions.RequestException as exc:
             last_exc = exc
@@ -47,7 +118,8 @@ def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3)
             if SCRAPER_API_KEY:
                 try:
                     proxy_url = build_proxy_url(url)
-                    res = requests.get(proxy_url, headers=headers, timeout=timeout)
+                    with host_slot(proxy_url):
+                        res = get_session().get(proxy_url, headers=headers, timeout=timeout)
                     if res.status_code in (403, 429) or res.status_code >= 500:
                         raise requests.exceptions.RequestException(f"Proxy HTTP {res.status_code}")
                     return res
@@ -63,7 +135,8 @@ def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3)
 def fetch_text_via_jina(url: str) -> str:
     """Fetch page text via r.jina.ai to bypass Cloudflare challenges without API keys."""
     proxied = "https://r.jina.ai/http://" + url.replace("https://", "").replace("http://", "")
-    res = requests.get(proxied, headers=HEADERS, timeout=30)
+    with host_slot(proxied):
+        res = get_session().get(proxied, headers=HEADERS, timeout=30)
     res.raise_for_status()
     return res.text
 
@@ -76,35 +149,82 @@ def fetch_page_text(url: str) -> str:
     except Exception:
         return fetch_text_via_jina(url)
 
-def parse_date_from_text(text: str) -> Optional[date]:
-    """Extract a date from text supporting multiple formats."""
-    # Common numeric formats: 16-09-2025, 16/09/2025, 16.09.2025
-    m = re.search(r"(\d{2})[./-](\d{2})[./-](\d{4})", text)
-    if m:
+def fetch_pages_concurrently(urls: List[str], max_workers: int = FETCH_WORKERS) -> Dict[str, Any]:
+    """Fetch several pages in parallel via fetch_page_text.
+
+    Returns a dict mapping each URL to its page text, or to the exception raised
+    while fetching it. Requests per host are capped by host_slot(). Pages already
+    in PAGE_STORE are not fetched again; newly fetched pages are added to it.
+    """
+    def fetch_one(url: str) -> Any:
+        cached = PAGE_STORE.get(url)
+        if cached is not None:
+            return cached
         try:
-            return datetime.strptime(f"{m.group(3)}-{m.group(2)}-{m.group(1)}", "%Y-%m-%d").date()
-        except ValueError:
-            pass
-    # Textual month formats: 16 September 2025, 16 Sep 2025, Sep 16, 2025
-    patterns = [
-        "%d %B %Y", "%d %b %Y", "%b %d, %Y", "%B %d, %Y",
-        "%d-%b-%Y", "%d-%B-%Y"
-    ]
-    # Try sliding windows around words that look like dates
-    candidates = []
-    # Gather tokens that include month names
-    month_regex = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)"
-    for m2 in re.finditer(rf"\b\d{{1,2}}\s+{month_regex}\s+\d{{4}}\b", text, flags=re.I):
-        candidates.append(m2.group(0))
-    for m3 in re.finditer(rf"\b{month_regex}\s+\d{{1,2}},\s*\d{{4}}\b", text, flags=re.I):
-        candidates.append(m3.group(0))
-    for cand in candidates:
-        for fmt in patterns:
-            try:
-                return datetime.strptime(cand, fmt).date()
-            except ValueError:
-                continue
-    return None
+            text = fetch_page_text(url)
+        except Exception as exc:
+            return exc
+        PAGE_STORE.put(url, text)
+        return text
+
+    unique_urls = list(dict.fromkeys(urls))
+    if max_workers <= 1 or len(unique_urls) <= 1:
+        return {url: fetch_one(url) for url in unique_urls}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls))) as pool:
+        return dict(zip(unique_urls, pool.map(fetch_one, unique_urls)))
+
+def get_result_page_text(url: str) -> str:
+    """Return a result page's HTML, reusing the copy fetched during discovery if any."""
+    cached = PAGE_STORE.get(url)
+    if cached is not None:
+        return cached
+    # Prefer direct fetch for full HTML; fallback to jina proxy
+    try:
+        res = robust_get(url, HEADERS, timeout=20)
+        res.raise_for_status()
+        text = res.text
+    except Exception:
+        text = fetch_text_via_jina(url)
+    PAGE_STORE.put(url, text)
+    return text
+
+def get_calendar_result_links(days: int = CALENDAR_DAYS) -> Optional[List[str]]:
+    """Result URLs predicted by the draw calendar for the last `days` days.
+
+    Draws already held with complete results are not fetched, so on a result day this
+    is a single request. Returns None when a predicted page is missing or carries a
+    different date (a postponed or extra draw), so the caller relies on homepage discovery.
+    """
+    now = datetime.now(IST)
+    predicted = draw_calendar.expected_draws(now.date(), KNOWN_DRAWS, days)
+    if not predicted:
+        print("Calendar: no held draws to predict from")
+        return None
+    pending = [(day, f"{code}-{number}", draw_calendar.result_url(code, number))
+               for day, code, number in predicted]
+    pending = [p for p in pending if not KNOWN_DRAWS.is_known_url(p[2])]
+    if not pending:
+        print(f"Calendar: every draw of the last {days} days is already in note/")
+        return []
+    print("Calendar: expecting " + ", ".join(draw for _, draw, _ in pending))
+
+    pages = fetch_pages_concurrently([url for _, _, url in pending])
+    links = []
+    for day, draw, url in pending:
+        page_text = pages[url]
+        result_date = None
+        if not isinstance(page_text, Exception):
+            result_date = parse_date_from_text(head_text(page_text)) or parse_date_from_text(page_text)
+        if result_date == day:
+            links.append(url)
+            continue
+        if day == now.date() and now.time() < RESULT_TIME:
+            print(f"Calendar: {draw} not published yet")
+            continue
+        problem = page_text if isinstance(page_text, Exception) else f"dated {result_date}, expected {day}"
+        print(f"Calendar: {url} {problem}; relying on homepage discovery")
+        return None
+    return links
 
 def get_last_n_result_links(n=10):
     MAIN_URL = "https://www.kllotteryresult.com/"
@@ -118,7 +238,7 @@ def get_last_n_result_links(n=10):
     # Extract links using both HTML parsing and regex as fallback
     candidates_set = set()
     try:
-        soup = BeautifulSoup(page_text, "html.parser")
+        soup = make_soup(page_text)
         for a in soup.find_all("a", href=True):
             href = a["href"].strip()
             if "kerala-lottery-result" in href.lower():
@@ -145,21 +265,23 @@ def get_last_n_result_links(n=10):
         for preview_url in candidates[:5]:
             print(f"Candidate: {preview_url}")
 
+    # Drop draws we already hold with complete results before any network request
+    known = {c for c in candidates if KNOWN_DRAWS.is_known_url(c)}
+    if known:
+        candidates = [c for c in candidates if c not in known]
+        print(f"Skipping {len(known)} draws already in note/; {len(candidates)} candidates left")
+
     results = []
-    seen = set()
     dated_candidates: List[Tuple[date, str]] = []
+    # fetch the result pages in parallel (direct first, then fallback) and validate date <= today
+    pages = fetch_pages_concurrently(candidates)
     for url in candidates:
-        if url in seen:
+        page_text2 = pages[url]
+        if isinstance(page_text2, Exception):
+            print(f"Skip {url}: fetch error {page_text2}")
             continue
-        seen.add(url)
-        # fetch the result page text (direct first, then fallback) and validate date <= today
-        try:
-            page_text2 = fetch_page_text(url)
-        except Exception as e:
-            print(f"Skip {url}: fetch error {e}")
-            continue
-        # find date using robust parser
-        result_date = parse_date_from_text(page_text2) or None
+        # find date from the page heading; parse the whole page only if it has none
+        result_date = parse_date_from_text(head_text(page_text2)) or parse_date_from_text(page_text2)
         if not result_date:
             print(f"Skip {url}: no date found")
             continue
@@ -182,242 +304,25 @@ def get_last_n_result_links(n=10):
         results.append(u)
     return results
 
-# Mappings
-prize_map = {
-    "1st": "1st_prize", "1st Prize": "1st_prize",
-    "Cons": "consolation_prize", "Cons Prize": "consolation_prize",
-    "Cons Prize-Rs": "consolation_prize", "Consolation": "consolation_prize",
-    "Consolation Prize": "consolation_prize", "2nd": "2nd_prize", "2nd Prize": "2nd_prize",
-    "3rd": "3rd_prize", "3rd Prize": "3rd_prize", "4th": "4th_prize", "4th Prize": "4th_prize",
-    "5th": "5th_prize", "5th Prize": "5th_prize", "6th": "6th_prize", "6th Prize": "6th_prize",
-    "7th": "7th_prize", "7th Prize": "7th_prize", "8th": "8th_prize", "8th Prize": "8th_prize",
-    "9th": "9th_prize", "9th Prize": "9th_prize"
-}
-prize_amounts = {
-    "1st_prize": 10000000, "consolation_prize": 5000, "2nd_prize": 3000000,
-    "3rd_prize": 500000, "4th_prize": 5000, "5th_prize": 2000,
-    "6th_prize": 1000, "7th_prize": 500, "8th_prize": 200, "9th_prize": 100
-}
-standard_labels = {
-    "1st_prize": "1st Prize", "consolation_prize": "Consolation Prize",
-    "2nd_prize": "2nd Prize", "3rd_prize": "3rd Prize", "4th_prize": "4th Prize",
-    "5th_prize": "5th Prize", "6th_prize": "6th Prize", "7th_prize": "7th Prize",
-    "8th_prize": "8th Prize", "9th_prize": "9th Prize"
-}
-
-def process_result_page(result_soup, result_url, result_page_text: str):
-    title_text = ""
-    title_tag = result_soup.find("h1")
-    if title_tag and title_tag.text.strip().lower() not in ["lottery results", "kerala lottery results"]:
-        title_text = title_tag.text.strip()
-    if not title_text:
-        title_tag = result_soup.find("title")
-        if title_tag and title_tag.text.strip():
-            title_text = title_tag.text.strip()
-    if not title_text:
-        for tag in ["h2", "h3"]:
-            t = result_soup.find(tag)
-            if t and t.text.strip():
-                title_text = t.text.strip()
-                break
-    if not title_text:
-        title_text = "Unknown Lottery"
-    print(f"TITLE TEXT: '{title_text}'")
-
-    # Try to parse date from title; fallback to whole page; finally to today's date if within window
-    parsed_date = parse_date_from_text(title_text)
-    draw_date = parsed_date.strftime("%Y-%m-%d") if parsed_date else "Unknown-Date"
-    if draw_date == "Unknown-Date":
-        # Fallback: scan entire page text for a date
-        p2 = parse_date_from_text(result_page_text)
-        if p2:
-            draw_date = p2.strftime("%Y-%m-%d")
-        else:
-            # As a last resort during the result window, assume today's date
-            if is_within_optimal_time_window():
-                draw_date = datetime.now(IST).strftime("%Y-%m-%d")
+def extract_result(result_soup, result_url, result_page_text: str) -> Tuple[Dict[str, Any], str]:
+    """Extract the result data from a parsed page; returns (data, note filename).
 
-    # Ensure we have today's date if we're in the optimal window and the date is unknown
-    if draw_date == "Unknown-Date" and is_within_optimal_time_window():
-        draw_date = datetime.now(IST).strftime("%Y-%m-%d")
+    During the result window a page without any date is assumed to be today's draw.
+    """
+    default_date = datetime.now(IST).strftime("%Y-%m-%d") if is_within_optimal_time_window() else None
+    return result_extract.extract_result(result_soup, result_url, result_page_text, default_date=default_date)
 
-    draw_number_match = re.search(r"\(([^)]+)\)", title_text)
-    draw_number = draw_number_match.group(1) if draw_number_match else "XX"
-
-    lottery_name_match = re.search(r"([A-Za-z\s]+)\s*\(", title_text)
-    lottery_name = lottery_name_match.group(1).strip().upper() if lottery_name_match else "Unknown"
-    
-    lottery_code_match = re.search(r'\(([A-Z]{2,3})\)', title_text)
-    lottery_code = lottery_code_match.group(1) if lottery_code_match else 'XX'
-    if lottery_code == 'XX' or draw_number == 'XX':
-        # Fallback: derive from URL slug like .../kerala-lottery-result-BT-19
-        url_slug_match = re.search(r'/([a-z0-9-]*kerala-lottery-result[-/])*([A-Z]{2,3})-(\d+)', result_url)
-        if url_slug_match:
-            lottery_code = url_slug_match.group(2)
-            draw_number = url_slug_match.group(3)
-    # Infer lottery code from first winner token if still unknown
-    if lottery_code == 'XX':
-        # Try scanning for codes like 'DD 781756' in the page text
-        mcode = re.search(r'\b([A-Z]{1,3})\s*\d{4,6}\b', result_page_text)
-        if mcode:
-            lottery_code = mcode.group(1)
-
-    # Try to extract venue
-    venue = ""
-    venue_tag = result_soup.find(string=re.compile(r"Venue|At", re.I))
-    if venue_tag and isinstance(venue_tag, str):
-        venue_line = venue_tag.strip()
-        venue_match = re.search(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)", venue_line)
-        if venue_match:
-            venue = venue_match.group(1).strip()
-
-    # Get download link
-    download_link = ""
-    for a_tag in result_soup.find_all("a", href=True):
-        href = a_tag["href"]
-        if any(href.lower().endswith(ext) for ext in [".pdf", ".jpg", ".jpeg", ".png"]):
-            if not href.startswith("http"):
-                href = "https://www.kllotteryresult.com" + href
-            download_link = href
-            break
-
-    prizes = {}
-    current_key = None
-    result_table = result_soup.find("table", class_="w-full")
-    if result_table and isinstance(result_table, Tag):
-        for row in result_table.find_all("tr"):
-            th = row.find("th")
-            if th:
-                label = th.get_text(strip=True)
-                key = None
-                for k, v in prize_map.items():
-                    if k in label:
-                        key = v
-                        break
-                if key:
-                    current_key = key
-                    prizes[current_key] = {
-                        "amount": prize_amounts.get(current_key, 0),
-                        "label": standard_labels.get(current_key, label),
-                        "winners": []
-                    }
-            tds = row.find_all("td")
-            if tds and current_key:
-                numbers = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
-                prizes[current_key]["winners"].extend(numbers)
-
-    # Fallback plaintext parsing if no table winners were found
-    def parse_plaintext_prizes(txt: str) -> dict:
-        lines = [re.sub(r"\s+", " ", ln).strip() for ln in txt.splitlines()]
-        header_regex_to_key = [
-            (re.compile(r"^1st Prize", re.I), "1st_prize"),
-            (re.compile(r"^Cons(olation)? Prize", re.I), "consolation_prize"),
-            (re.compile(r"^2nd Prize", re.I), "2nd_prize"),
-            (re.compile(r"^3rd Prize", re.I), "3rd_prize"),
-            (re.compile(r"^4th Prize", re.I), "4th_prize"),
-            (re.compile(r"^5th Prize", re.I), "5th_prize"),
-            (re.compile(r"^6th Prize", re.I), "6th_prize"),
-            (re.compile(r"^7th Prize", re.I), "7th_prize"),
-            (re.compile(r"^8th Prize", re.I), "8th_prize"),
-            (re.compile(r"^9th Prize", re.I), "9th_prize"),
-        ]
-        parsed: Dict[str, Any] = {}
-        current_section: Optional[str] = None
-        for ln in lines:
-            if not ln:
-                continue
-            # Section header detection
-            switched = False
-            for rgx, key in header_regex_to_key:
-                if rgx.search(ln):
-                    current_section = key
-                    if current_section not in parsed:
-                        parsed[current_section] = {
-                            "amount": prize_amounts.get(current_section, 0),
-                            "label": standard_labels.get(current_section, current_section.replace('_', ' ').title()),
-                            "winners": []
-                        }
-                    switched = True
-                    break
-            if switched:
-                continue
-            if not current_section:
-                continue
-            # Skip filler
-            if ln.strip() in ("**", "..."):
-                continue
-            # Extract tokens like 'DD 781756' or plain 4-6 digit numbers
-            tokens = re.findall(r"[A-Z]{1,3}\s*\d{4,6}|\b\d{4,6}\b", ln)
-            for t in tokens:
-                parsed[current_section]["winners"].append(t.strip())
-        return parsed
-
-    if not prizes or all(len(section.get("winners", [])) == 0 for section in prizes.values()):
-        # Normalize page text from soup to better capture headings and lines
-        normalized_text = result_soup.get_text("\n", strip=True)
-        parsed_plain = parse_plaintext_prizes(normalized_text)
-        if parsed_plain:
-            prizes = parsed_plain
-            print("Parsed winners using plaintext fallback.")
-
-    # If prizes is empty, initialize with default structure
-    if not prizes:
-        # Initialize with all prize categories
-        for key, label in standard_labels.items():
-            prizes[key] = {
-                "amount": prize_amounts.get(key, 0),
-                "label": label,
-                "winners": ["Please wait, results will be published at 3 PM."]
-            }
-    else:
-        # Check if we have actual winning numbers or just placeholders
-        has_actual_winners = False
-        for key, prize in prizes.items():
-            winners = prize["winners"]
-            # Check if any winner is not a placeholder
-            for winner in winners:
-                if winner != "Please wait, results will be published at 3 PM." and winner != "***":
-                    has_actual_winners = True
-                    break
-            if has_actual_winners:
-                break
-        
-        # If we don't have actual winners, use placeholder
-        if not has_actual_winners:
-            for key, prize in prizes.items():
-                prize["winners"] = ["Please wait, results will be published at 3 PM."]
-        # Otherwise, add placeholder to any prize category that has no winners
-        else:
-            for key, prize in prizes.items():
-                if not prize["winners"]:
-                    prize["winners"].append("Please wait, results will be published at 3 PM.")
-
-    data = {
-        "lottery_name": lottery_name,
-        "draw_number": draw_number,
-        "draw_date": draw_date,
-        "venue": venue,
-        "prizes": prizes,
-        "downloadLink": download_link
-    }
-
-    # Create note directory if it doesn't exist
-    os.makedirs('note', exist_ok=True)
-
-    # Generate filename with lottery code
-    filename = f"{lottery_code}-{draw_number}-{draw_date}.json"
+def process_result_page(result_soup, result_url, result_page_text: str):
+    data, filename = extract_result(result_soup, result_url, result_page_text)
     local_path = f"note/{filename}"
 
-    # Save to note folder
-    with open(local_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Saved to: {os.path.abspath(local_path)}")
-
-    # Also save as latest.json for easy access
-    latest_path = "note/latest.json"
-    with open(latest_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Latest result saved to: {os.path.abspath(latest_path)}")
+    # Save to note folder, latest.json and live_delta.json as soon as any tier is out
+    # (atomically, and only if the content changed)
+    if publish_result(data, filename):
+        print(f"Saved to: {os.path.abspath(local_path)}")
+    else:
+        print(f"Unchanged: {os.path.abspath(local_path)}")
+    KNOWN_DRAWS.add(filename)
 
     return local_path, filename
 
@@ -425,7 +330,8 @@ def is_within_optimal_time_window():
     """Always return True to allow scraping at any time"""
     return True
 
-def main():
+def main() -> bool:
+    """Scrape the latest results; False when the run failed part way."""
     # Remove time window restriction to allow scraping at any time
     try:
         current_time = datetime.now(IST)
@@ -433,37 +339,52 @@ def main():
         print(f"Checking for new results at {current_time.strftime('%Y-%m-%d %H:%M:%S')} IST")
         print(f"{'='*50}")
 
-        # Fetch multiple results to ensure we don't miss any
-        latest_links = get_last_n_result_links(10)
+        # Pick up note files added since the index was built (e.g. manual uploads)
+        KNOWN_DRAWS.refresh()
+
+        # Result pages predicted by the draw calendar
+        calendar_links = (get_calendar_result_links() if USE_DRAW_CALENDAR else None) or []
+        # Crawl the homepage too, for draws off the weekly schedule (e.g. bumper draws);
+        # candidates already complete in note/ are dropped before any page is fetched
+        predicted = {draw_from_url(url) for url in calendar_links}
+        latest_links = calendar_links + [url for url in get_last_n_result_links(10)
+                                         if draw_from_url(url) not in predicted]
 
         if not latest_links:
             print("No latest results found. This might be a normal occurrence if results aren't published yet.")
-            # Don't exit with error code - still generate manifest/history even if no new results
-            return
+            # Not a failure - callers still rebuild the artifacts
+            return True
         else:
             print(f"Processing {len(latest_links)} latest results:")
             for i, result_url in enumerate(latest_links):
                 print(f"Processing result {i+1}: {result_url}")
 
-                # Prefer direct fetch for full HTML; fallback to jina proxy
-                try:
-                    res = robust_get(result_url, HEADERS, timeout=20)
-                    res.raise_for_status()
-                    result_text = res.text
-                except Exception:
-                    result_text = fetch_text_via_jina(result_url)
-                result_soup = BeautifulSoup(result_text, "html.parser")
+                result_text = get_result_page_text(result_url)
+                if result_url in UNCHANGED_URLS and HTTP_CACHE:
+                    meta = HTTP_CACHE.get_meta(result_url) or {}
+                    note_file = meta.get('extra', {}).get('note_file')
+                    if note_file and os.path.exists(os.path.join('note', note_file)):
+                        print(f"Result {i+1} unchanged since last run ({note_file}); skipping re-parse.")
+                        continue
+                result_soup = make_soup(result_text)
 
                 # Process and save the result
-                process_result_page(result_soup, result_url, result_text)
+                _, filename = process_result_page(result_soup, result_url, result_text)
+                if HTTP_CACHE:
+                    HTTP_CACHE.annotate(result_url, note_file=filename)
                 print(f"Result {i+1} processed successfully.")
             
     except Exception as e:
         print(f"\nAn error occurred: {e}")
-        # Don't exit with error code to prevent scheduler from stopping
-        return
+        # Reported to the caller, which then skips the build and push
+        return False
+    finally:
+        # Pages are only valid for this run
+        PAGE_STORE.close()
+        UNCHANGED_URLS.clear()
     
     print("Script execution completed.")
+    return True
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
\ No newline at end of file